@@ -0,0 +1,201 @@
+import numpy as np
+
+from simulator import (BACCARAT_VALUES, RANKS, SUITS, BaccaratSimulator, CompactShoe, Fibonacci,
+                       FlatBetting, Martingale, PositiveStableFibonacci, banker_draws)
+
+# ==========================================
+# 1. Third Card Rules as Lookup Tables
+# ==========================================
+NO_THIRD = 10 # Player third card index meaning "player stood"
+
+def _build_tables():
+    player = np.zeros((10, 10), dtype=bool)
+    banker = np.zeros((10, 10, 11), dtype=bool)
+    for p in range(10):
+        for b in range(10):
+            if p in (8, 9) or b in (8, 9): continue # Naturals, nobody draws
+            player[p, b] = p <= 5
+            for t in range(10):
+                banker[p, b, t] = player[p, b] and banker_draws(b, t)
+            banker[p, b, NO_THIRD] = not player[p, b] and banker_draws(b, None)
+    return player, banker
+
+# PLAYER_DRAWS[player total, banker total]
+# BANKER_DRAWS[player two-card total, banker total, player third card or NO_THIRD]
+PLAYER_DRAWS, BANKER_DRAWS = _build_tables()
+VALUES = np.array(BACCARAT_VALUES, dtype=np.int8)
+
+# ==========================================
+# 2. Per-Lane Betting Strategies
+# ==========================================
+class BatchStrategy:
+    """Array version of BettingStrategy: one entry per lane, seeded from a scalar template."""
+    def __init__(self, template, lanes):
+        self.bankroll = np.full(lanes, template.bankroll, dtype=float)
+        self.profit = np.full(lanes, template.profit, dtype=float)
+        self.base_unit = template.base_unit
+        self.current_bet = np.full(lanes, template.current_bet, dtype=float)
+
+    def update_after_result(self, lanes, net_win):
+        self.bankroll[lanes] += net_win
+        self.profit[lanes] += net_win
+        self._adjust_bet(lanes, net_win)
+
+    def _adjust_bet(self, lanes, net_win):
+        pass
+
+    def get_bet(self):
+        return np.where(self.bankroll > 0, np.minimum(self.current_bet, self.bankroll), 0.0)
+
+class BatchFlatBetting(BatchStrategy):
+    pass
+
+class BatchMartingale(BatchStrategy):
+    def _adjust_bet(self, lanes, net_win):
+        bets = self.current_bet[lanes]
+        bets[net_win > 0] = self.base_unit
+        bets[net_win < 0] *= 2
+        self.current_bet[lanes] = bets
+
+class BatchFibonacci(BatchStrategy):
+    def __init__(self, template, lanes):
+        super().__init__(template, lanes)
+        self.sequence = np.array(template.sequence, dtype=float)
+        self.index = np.full(lanes, template.index, dtype=np.int64)
+        self.is_positive = template.is_positive
+
+    def _adjust_bet(self, lanes, net_win):
+        decided = net_win != 0 # Push doesn't change sequence
+        lanes, net_win = lanes[decided], net_win[decided]
+        won = net_win > 0
+        move_up = won if self.is_positive else ~won
+
+        index = self.index[lanes]
+        index = np.where(move_up, self._lose_bet(index), self._win_bet(index))
+        self.index[lanes] = index
+        self.current_bet[lanes] = self.base_unit * self.sequence[index]
+
+    def _lose_bet(self, index):
+        return np.minimum(index + 1, len(self.sequence) - 1)
+    def _win_bet(self, index):
+        return np.maximum(index - 2, 0)
+
+class BatchPositiveStableFibonacci(BatchFibonacci):
+    def _win_bet(self, index):
+        return np.zeros_like(index)
+
+BATCH_STRATEGIES = {
+    FlatBetting: BatchFlatBetting,
+    Martingale: BatchMartingale,
+    PositiveStableFibonacci: BatchPositiveStableFibonacci,
+    Fibonacci: BatchFibonacci,
+}
+
+def batch_strategy(template, lanes):
+    """Builds the per-lane version of a scalar strategy instance."""
+    for cls in type(template).__mro__:
+        if cls in BATCH_STRATEGIES:
+            return BATCH_STRATEGIES[cls](template, lanes)
+    raise TypeError(f"No batch version of {template.__class__.__name__}")
+
+# ==========================================
+# 3. Batch Engine
+# ==========================================
+class BatchBaccaratSimulator:
+    """
+    Plays the same Banker bet as BaccaratSimulator on many independent
+    shoes and bankrolls at once, one NumPy operation per card position.
+    """
+    def __init__(self, strategy: BatchStrategy, num_decks=8, penetration=0.75, seed=None):
+        self.strategy = strategy
+        self.lanes = len(strategy.bankroll)
+        self.rng = np.random.default_rng(seed)
+
+        # Reuse CompactShoe's deck layout and cut position so both engines reshuffle alike
+        layout = CompactShoe(num_decks, penetration)
+        self.cut = layout.cut
+        deck = np.repeat(np.arange(len(RANKS), dtype=np.int8), len(SUITS))
+        self.shoes = np.tile(np.tile(deck, num_decks), (self.lanes, 1))
+        self.pos = np.zeros(self.lanes, dtype=np.int64)
+        self.shuffle(np.arange(self.lanes))
+
+    def shuffle(self, lanes):
+        self.shoes[lanes] = self.rng.permuted(self.shoes[lanes], axis=1)
+        self.pos[lanes] = 0
+
+    def draw(self, lanes):
+        """Deals one card to each of the given lanes and returns their baccarat values."""
+        pos = self.pos[lanes]
+        stale = pos >= self.cut
+        if stale.any():
+            self.shuffle(lanes[stale])
+            pos = self.pos[lanes]
+        self.pos[lanes] = pos + 1
+        return VALUES[self.shoes[lanes, pos]]
+
+    def play_round(self):
+        bets = self.strategy.get_bet()
+        lanes = np.flatnonzero(bets > 0)
+        if len(lanes) == 0: return # Everyone bankrupt
+        bets = bets[lanes]
+
+        # Same dealing order as the scalar engine: player, player, banker, banker
+        p_score = self.draw(lanes) + self.draw(lanes)
+        b_score = self.draw(lanes) + self.draw(lanes)
+        p_score %= 10
+        b_score %= 10
+
+        # Third card rules
+        third = np.full(len(lanes), NO_THIRD, dtype=np.int8)
+        p_draws = PLAYER_DRAWS[p_score, b_score]
+        if p_draws.any():
+            third[p_draws] = self.draw(lanes[p_draws])
+        b_draws = BANKER_DRAWS[p_score, b_score, third]
+        p_score = np.where(p_draws, (p_score + third) % 10, p_score)
+        if b_draws.any():
+            b_score[b_draws] = (b_score[b_draws] + self.draw(lanes[b_draws])) % 10
+
+        # Resolution (always Banker, 5% commission)
+        win_amount = np.where(b_score > p_score, bets * 0.95, -bets)
+        win_amount[b_score == p_score] = 0 # Push
+
+        self.strategy.update_after_result(lanes, win_amount)
+
+    def run(self, rounds):
+        for _ in range(rounds):
+            self.play_round()
+        return self.strategy
+
+def compare_with_scalar(template_factory, rounds=1000, lanes=10000, scalar_trials=200, seed=None):
+    """Mean profit (and its standard error) of both engines for the same strategy."""
+    batch = BatchBaccaratSimulator(batch_strategy(template_factory(), lanes), seed=seed).run(rounds)
+
+    scalar = []
+    for _ in range(scalar_trials):
+        strat = template_factory()
+        game = BaccaratSimulator(strat, CompactShoe(num_decks=8))
+        for _ in range(rounds):
+            game.play_round()
+        scalar.append(strat.profit)
+    scalar = np.array(scalar)
+
+    return {
+        'batch': (batch.profit.mean(), batch.profit.std() / np.sqrt(lanes)),
+        'scalar': (scalar.mean(), scalar.std() / np.sqrt(scalar_trials)),
+    }
+
+if __name__ == "__main__":
+    ROUNDS = 1000
+    LANES = 10000
+    STARTING_BANKROLL = 5000
+    BASE_UNIT = 10
+
+    print(f"--- Batch vs scalar Baccarat, {ROUNDS} hands ---")
+    for name, factory in [
+        ("FlatBetting", lambda: FlatBetting(STARTING_BANKROLL, BASE_UNIT)),
+        ("Martingale", lambda: Martingale(STARTING_BANKROLL, BASE_UNIT)),
+        ("Fibonacci", lambda: Fibonacci(STARTING_BANKROLL, BASE_UNIT)),
+    ]:
+        res = compare_with_scalar(factory, ROUNDS, LANES)
+        print(f"{name}: batch ${res['batch'][0]:.2f} ± {res['batch'][1]:.2f} | "
+              f"scalar ${res['scalar'][0]:.2f} ± {res['scalar'][1]:.2f}")
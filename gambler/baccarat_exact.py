@@ -0,0 +1,178 @@
+import time
+from fractions import Fraction
+from functools import lru_cache
+
+from simulator import BACCARAT_VALUES, RANKS, SUITS, CompactShoe, banker_draws
+
+# ==========================================
+# 1. Composition Helpers
+# ==========================================
+def full_shoe_counts(num_decks=8):
+    return [len(SUITS) * num_decks] * len(RANKS)
+
+def value_counts(rank_counts):
+    """Folds 13 rank counts into 10 baccarat value counts (T/J/Q/K all count as 0)."""
+    counts = [0] * 10
+    for rank, n in enumerate(rank_counts):
+        counts[BACCARAT_VALUES[rank]] += n
+    return tuple(counts)
+
+def _pairs(counts):
+    """Unordered two-card draws as (first, second, number of ordered ways)."""
+    for a in range(10):
+        if not counts[a]: continue
+        if counts[a] > 1:
+            yield a, a, counts[a] * (counts[a] - 1)
+        for b in range(a + 1, 10):
+            if counts[b]:
+                yield a, b, 2 * counts[a] * counts[b]
+
+# ==========================================
+# 2. Exact Enumeration
+# ==========================================
+@lru_cache(maxsize=4096)
+def _outcome_weights(counts):
+    """
+    Number of ordered 6-card sequences (banker, player, tie) leading to each
+    result when the hand is dealt from `counts`. Hands that use fewer than six
+    cards are scaled by the ways to draw the unused cards, so every weight has
+    the same denominator n(n-1)(n-2)(n-3)(n-4)(n-5).
+    """
+    n = sum(counts)
+    tail4 = (n - 4) * (n - 5) # Ways to fill cards 5 and 6
+    tail5 = n - 5
+    banker = player = tie = 0
+    left = list(counts)
+
+    for p1, p2, p_ways in _pairs(counts):
+        left[p1] -= 1
+        left[p2] -= 1
+        p_score = (p1 + p2) % 10
+        for b1, b2, b_ways in _pairs(left):
+            left[b1] -= 1
+            left[b2] -= 1
+            b_score = (b1 + b2) % 10
+            ways = p_ways * b_ways
+
+            if p_score >= 8 or b_score >= 8 or (p_score > 5 and not banker_draws(b_score, None)):
+                # Naturals, or both hands stand
+                res = [0, 0, 0]
+                res[_result(p_score, b_score)] = ways * tail4
+            else:
+                res = _draws(left, n - 4, p_score, b_score, ways, tail5)
+
+            banker += res[0]
+            player += res[1]
+            tie += res[2]
+            left[b1] += 1
+            left[b2] += 1
+        left[p1] += 1
+        left[p2] += 1
+
+    return banker, player, tie
+
+def _draws(left, n_left, p_score, b_score, ways, tail5):
+    """Weights of the hands where at least one side takes a third card."""
+    # Banker's final score if he draws card u is (b_score + u) % 10;
+    # below[s] = ways to end strictly under s
+    final = [left[(s - b_score) % 10] for s in range(10)]
+    below = [0] * 11
+    for s in range(10):
+        below[s + 1] = below[s] + final[s]
+
+    def banker_third(p_final, removed):
+        # (banker, player, tie) ways for the banker's card, one copy of `removed` already dealt
+        lo, eq, hi = below[p_final], final[p_final], n_left - below[p_final + 1]
+        if removed is not None:
+            gone = (b_score + removed) % 10
+            if gone < p_final: lo -= 1
+            elif gone > p_final: hi -= 1
+            else: eq -= 1
+        return hi, lo, eq
+
+    res = [0, 0, 0]
+    if p_score > 5:
+        # Player stands, banker draws
+        hi, lo, eq = banker_third(p_score, None)
+        res[0] += ways * hi * tail5
+        res[1] += ways * lo * tail5
+        res[2] += ways * eq * tail5
+        return res
+
+    for t in range(10):
+        if not left[t]: continue
+        p3 = (p_score + t) % 10
+        t_ways = ways * left[t]
+        if banker_draws(b_score, t):
+            hi, lo, eq = banker_third(p3, t)
+            res[0] += t_ways * hi
+            res[1] += t_ways * lo
+            res[2] += t_ways * eq
+        else:
+            res[_result(p3, b_score)] += t_ways * tail5
+    return res
+
+def _result(p_score, b_score):
+    if b_score > p_score: return 0
+    if p_score > b_score: return 1
+    return 2
+
+# ==========================================
+# 3. Public API
+# ==========================================
+def analyze(rank_counts=None, exact=False):
+    """
+    Outcome probabilities and per-unit EV of each bet for the next hand dealt
+    from a shoe holding `rank_counts` cards of each rank (RANKS order).
+    Defaults to a fresh 8-deck shoe. With exact=True values are Fractions.
+    """
+    counts = value_counts(rank_counts if rank_counts is not None else full_shoe_counts())
+    n = sum(counts)
+    if n < 6:
+        raise ValueError("At least 6 cards are needed to deal a hand")
+
+    banker, player, tie = _outcome_weights(counts)
+    total = banker + player + tie
+    num = Fraction if exact else (lambda a, b: a / b)
+    p_banker, p_player, p_tie = num(banker, total), num(player, total), num(tie, total)
+
+    # Payouts match BaccaratSimulator.play_round: Banker pays 0.95, Tie pays 8, ties push Banker/Player
+    return {
+        'banker': p_banker,
+        'player': p_player,
+        'tie': p_tie,
+        'ev_banker': p_banker * num(95, 100) - p_player,
+        'ev_player': p_player - p_banker,
+        'ev_tie': p_tie * 8 - (1 - p_tie),
+    }
+
+def analyze_shoe(shoe):
+    return analyze(shoe.rank_counts())
+
+def removal_effects(bet='ev_banker', num_decks=8):
+    """Change of the bet's EV when one deck's worth (4 cards) of each rank leaves the shoe, RANKS order."""
+    full = full_shoe_counts(num_decks)
+    base = analyze(full)[bet]
+    effects = []
+    for rank in range(len(RANKS)):
+        counts = list(full)
+        counts[rank] -= len(SUITS)
+        effects.append(analyze(counts)[bet] - base)
+    return effects
+
+if __name__ == "__main__":
+    res = analyze()
+    print("--- Exact odds, fresh 8-deck shoe ---")
+    print(f"Banker {res['banker']:.6f} | Player {res['player']:.6f} | Tie {res['tie']:.6f}")
+    print(f"EV Banker {res['ev_banker']:+.6f} | EV Player {res['ev_player']:+.6f} | EV Tie {res['ev_tie']:+.6f}")
+
+    # Mid-shoe compositions from a real shoe, the way an engine would query them
+    shoe = CompactShoe(num_decks=8)
+    start = time.perf_counter()
+    hands = 200
+    for _ in range(hands):
+        for _ in range(5):
+            shoe.draw()
+        analyze_shoe(shoe)
+    elapsed = time.perf_counter() - start
+    print(f"{hands} mid-shoe compositions in {elapsed * 1000:.0f} ms ({elapsed / hands * 1000:.2f} ms each)")
@@ -0,0 +1,116 @@
+import csv
+import os
+
+from simulator import BlackjackRules, BlackjackSimulator, CompactShoe, FlatBetting
+
+CHART_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'charts')
+
+# ==========================================
+# 1. Chart Compilation
+# ==========================================
+# Row offsets of the compiled table: hard totals, soft totals and pairs each get 22 slots
+HARD, SOFT, PAIR = 0, 22, 44
+ROWS = 66
+UPCARDS = 10 # Dealer upcard values 2..11, column index value - 2
+
+def chart_path(rules):
+    """Chart file for a rule set, e.g. charts/double_deck_h17.csv. Raises FileNotFoundError if it is missing."""
+    decks = {1: 'single_deck', 2: 'double_deck'}.get(rules.num_decks, 'multi_deck')
+    dealer = 'h17' if rules.dealer_hits_soft_17 else 's17'
+    path = os.path.join(CHART_DIR, f"{decks}_{dealer}.csv")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No basic strategy chart for {rules.num_decks} deck(s), {dealer}: {path}")
+    return path
+
+def _preferences(code, rules):
+    """Turns a chart code into the actions to try in order; the first allowed one is played."""
+    if code in ('H', 'S', 'P'): return code
+    if code == 'D': return 'DH'
+    if code == 'Ds': return 'DS'
+    if code == 'Ph': return 'P' if rules.double_after_split else 'H'
+    if code in ('Rh', 'Rs', 'Rp'):
+        fallback = code[1].upper()
+        return 'R' + fallback if rules.surrender else fallback
+    raise ValueError(f"Unknown chart code {code!r}")
+
+def _row(key):
+    kind, value = key[0], int(key[1:])
+    if kind == 'H': return HARD + value
+    if kind == 'S': return SOFT + value
+    if kind == 'P': return PAIR + value
+    raise ValueError(f"Unknown chart row {key!r}")
+
+class BasicStrategyChart:
+    """
+    Basic strategy compiled into one flat table indexed by
+    row * UPCARDS + upcard index, where a row is a hard total, soft total or pair.
+    Rule-dependent codes (Ph, Rh, ...) are resolved for `rules` at load time.
+    """
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def load(cls, path, rules):
+        table = [None] * (ROWS * UPCARDS)
+        with open(path, newline='') as f:
+            lines = (line for line in f if not line.startswith('#'))
+            reader = csv.reader(lines)
+            header = next(reader)
+            if len(header) != UPCARDS + 1:
+                raise ValueError(f"{path}: expected {UPCARDS} upcard columns")
+            for key, *codes in reader:
+                base = _row(key) * UPCARDS
+                for up, code in enumerate(codes):
+                    table[base + up] = _preferences(code.strip(), rules)
+        return cls(tuple(table))
+
+    @classmethod
+    def for_rules(cls, rules):
+        return cls.load(chart_path(rules), rules)
+
+    def action(self, hand, upcard_value, can_double, can_split, can_surrender):
+        up = upcard_value - 2
+        prefs = None
+        if can_split:
+            prefs = self.table[(PAIR + hand.pair_value) * UPCARDS + up]
+        if prefs is None:
+            row = (SOFT if hand.soft else HARD) + hand.score
+            prefs = self.table[row * UPCARDS + up]
+        if prefs is None:
+            return 'H' if hand.score < 17 else 'S' # Not in the chart
+        for action in prefs:
+            if action == 'D' and not can_double: continue
+            if action == 'R' and not can_surrender: continue
+            return action
+        return prefs[-1]
+
+# ==========================================
+# 2. Engine
+# ==========================================
+class BasicStrategySimulator(BlackjackSimulator):
+    """BlackjackSimulator playing the full basic strategy chart for its rules."""
+    def __init__(self, strategy, shoe, rules=None, chart=None):
+        super().__init__(strategy, shoe, rules)
+        self.chart = chart or BasicStrategyChart.for_rules(self.rules)
+
+    def get_action(self, player_hand, dealer_upcard):
+        return self.chart.action(player_hand, dealer_upcard.get_value("blackjack"),
+                                 self.can_double(player_hand), self.can_split(player_hand),
+                                 self.can_surrender(player_hand))
+
+if __name__ == "__main__":
+    ROUNDS = 200000
+    BASE_UNIT = 10
+
+    print(f"--- Blackjack, {ROUNDS} hands, 6 decks ---")
+    for name, rules in [
+        ("S17 DAS", BlackjackRules(num_decks=6)),
+        ("H17 DAS", BlackjackRules(num_decks=6, dealer_hits_soft_17=True)),
+        ("H17 DAS LS", BlackjackRules(num_decks=6, dealer_hits_soft_17=True, surrender=True)),
+    ]:
+        for engine in (BlackjackSimulator, BasicStrategySimulator):
+            strat = FlatBetting(10**9, BASE_UNIT)
+            game = engine(strat, CompactShoe(num_decks=6), rules)
+            for _ in range(ROUNDS):
+                game.play_round()
+            print(f"{name} ({engine.__name__}): EV = {strat.profit / (ROUNDS * BASE_UNIT):+.2%} per hand")
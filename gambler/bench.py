@@ -0,0 +1,155 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from runner import TrialConfig, build_game
+from simulator import CompactShoe, Fibonacci, FlatBetting, HiLoCounting, Martingale, PositiveStableFibonacci, Shoe
+
+GAMES = ('baccarat', 'blackjack')
+STRATEGIES = (FlatBetting, Martingale, Fibonacci, PositiveStableFibonacci, HiLoCounting)
+SHOES = {'shoe': Shoe, 'compact': CompactShoe}
+
+# Big enough that no strategy goes bankrupt and starts skipping rounds
+BANKROLL = 10**12
+BASE_UNIT = 10
+
+# ==========================================
+# 1. Measurements
+# ==========================================
+def _game(config, seed):
+    return build_game(config, random.Random(seed))
+
+def count_cards(config, rounds, seed):
+    """Cards drawn in `rounds` rounds; same seed as the timed run, so the same cards."""
+    game = _game(config, seed)
+    drawn = 0
+    draw = game.shoe.draw
+    def counting_draw():
+        nonlocal drawn
+        drawn += 1
+        return draw()
+    game.shoe.draw = counting_draw
+    for _ in range(rounds):
+        game.play_round()
+    return drawn
+
+def time_rounds(config, rounds, seed, repeat):
+    """Best wall time of `repeat` runs of `rounds` rounds."""
+    best = float('inf')
+    for _ in range(repeat):
+        game = _game(config, seed)
+        play = game.play_round
+        start = time.perf_counter_ns()
+        for _ in range(rounds):
+            play()
+        best = min(best, time.perf_counter_ns() - start)
+    return best
+
+def measure_allocations(config, rounds, seed):
+    """(mean peak bytes allocated inside one round, live blocks kept per round)."""
+    game = _game(config, seed)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        peak_total = 0
+        for _ in range(rounds):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            game.play_round()
+            peak_total += tracemalloc.get_traced_memory()[1] - current
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return peak_total / rounds, retained / rounds
+
+def bench_one(config, rounds, seed, repeat, alloc_rounds):
+    elapsed_ns = time_rounds(config, rounds, seed, repeat)
+    cards = count_cards(config, rounds, seed)
+    peak_bytes, retained_blocks = measure_allocations(config, alloc_rounds, seed)
+    return {
+        'rounds_per_sec': rounds / (elapsed_ns / 1e9),
+        'ns_per_card': elapsed_ns / cards,
+        'cards_per_round': cards / rounds,
+        'alloc_peak_bytes_per_round': peak_bytes,
+        'retained_blocks_per_round': retained_blocks,
+    }
+
+def bench_key(config):
+    shoe = next(name for name, cls in SHOES.items() if cls is config.shoe_cls)
+    return f"{config.game}/{config.strategy_cls.__name__}/{config.num_decks}d/{config.penetration}/{shoe}"
+
+# ==========================================
+# 2. Baseline Comparison
+# ==========================================
+def compare(results, baseline, threshold):
+    """Keys whose rounds/sec dropped by more than `threshold` (fraction) against the baseline."""
+    regressions = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if base is None: continue
+        change = res['rounds_per_sec'] / base['rounds_per_sec'] - 1
+        if change < -threshold:
+            regressions.append((key, change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gambler engines and strategies.")
+    parser.add_argument('--rounds', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per pair, best one counts")
+    parser.add_argument('--alloc-rounds', type=int, default=2000)
+    parser.add_argument('--decks', type=int, nargs='+', default=[6, 8])
+    parser.add_argument('--penetration', type=float, nargs='+', default=[0.75])
+    parser.add_argument('--shoe', choices=SHOES, nargs='+', default=['compact'])
+    parser.add_argument('--game', choices=GAMES, nargs='+', default=list(GAMES))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', help="earlier --out file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed rounds/sec drop, e.g. 0.10 = 10%%")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for game in args.game:
+        for strategy_cls in STRATEGIES:
+            for decks in args.decks:
+                for penetration in args.penetration:
+                    for shoe in args.shoe:
+                        config = TrialConfig(game, strategy_cls, {'bankroll': BANKROLL, 'base_unit': BASE_UNIT},
+                                             num_decks=decks, penetration=penetration, shoe_cls=SHOES[shoe])
+                        key = bench_key(config)
+                        res = bench_one(config, args.rounds, args.seed, args.repeat, args.alloc_rounds)
+                        results[key] = res
+                        print(f"{key:<50} {res['rounds_per_sec']:>10.0f} rounds/s {res['ns_per_card']:>8.0f} ns/card "
+                              f"{res['alloc_peak_bytes_per_round']:>8.0f} B/round")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rounds': args.rounds,
+            'seed': args.seed,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for key, change in regressions:
+            print(f"REGRESSION {key}: {change:+.1%} rounds/s")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
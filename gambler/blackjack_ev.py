@@ -0,0 +1,267 @@
+import time
+from collections import OrderedDict
+
+from simulator import BLACKJACK_VALUES, BlackjackSimulator, CompactShoe, FlatBetting
+
+# ==========================================
+# 1. Hand State Helpers
+# ==========================================
+# Blackjack values 2..11 (11 = ace) are stored at index value - 2
+CARD_VALUES = tuple(range(2, 12))
+OUTCOMES = (17, 18, 19, 20, 21) # Dealer final totals; index 5 is bust
+
+def value_counts(rank_counts):
+    """Folds 13 rank counts into 10 blackjack value counts (2..9, ten, ace)."""
+    counts = [0] * 10
+    for rank, n in enumerate(rank_counts):
+        counts[BLACKJACK_VALUES[rank] - 2] += n
+    return tuple(counts)
+
+def add_card(total, soft, value):
+    """(total, soft) after drawing a card worth `value`; soft means one ace still counts 11."""
+    if value == 11:
+        if total + 11 <= 21: return total + 11, True
+        total += 1
+    else:
+        total += value
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+def _topological(starts):
+    """Hand states reachable from `starts`, ordered so every state comes before the states it can draw into."""
+    order, seen = [], set()
+    def visit(state):
+        if state in seen or state[0] > 21: return
+        seen.add(state)
+        for value in CARD_VALUES:
+            visit(add_card(*state, value))
+        order.append(state)
+    for state in starts:
+        visit(state)
+    order.reverse()
+    return order
+
+# Every (total, soft) the player or dealer can hold, in drawing order, and the index of the
+# state after each card value; BUST is one extra slot standing for every total over 21
+HAND_STATES = _topological([add_card(0, False, v) for v in CARD_VALUES])
+STATE_INDEX = {state: i for i, state in enumerate(HAND_STATES)}
+BUST = len(HAND_STATES)
+NEXT_INDEX = [tuple(STATE_INDEX.get(add_card(*state, v), BUST) for v in CARD_VALUES) for state in HAND_STATES]
+
+def _dealer_plan(hits_soft_17):
+    """
+    [(state index, ((card value index, next drawing state), ...), ((card value index, outcome), ...))]
+    for every state the dealer draws from, in drawing order. Outcomes 0-4 are 17-21, 5 is bust.
+    """
+    def draws(i):
+        if i == BUST: return False
+        total, soft = HAND_STATES[i]
+        return total < 17 or (total == 17 and soft and hits_soft_17)
+    def outcome(j):
+        return 5 if j == BUST else HAND_STATES[j][0] - 17
+    return [(i, tuple((v, j) for v, j in enumerate(NEXT_INDEX[i]) if draws(j)),
+             tuple((v, outcome(j)) for v, j in enumerate(NEXT_INDEX[i]) if not draws(j)))
+            for i in range(BUST) if draws(i)]
+
+DEALER_PLANS = {False: _dealer_plan(False), True: _dealer_plan(True)}
+# Indices a hand can still reach from each state, successors first, so a decision only evaluates its own subtree
+REACHABLE = [[STATE_INDEX[state] for state in reversed(_topological([start]))] for start in HAND_STATES]
+
+# ==========================================
+# 2. Bounded Cache
+# ==========================================
+class LRUCache:
+    def __init__(self, maxsize=200_000):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+# ==========================================
+# 3. Composition Dependent EVs
+# ==========================================
+class EVTable:
+    """
+    Stand/hit/double EVs of the hand states against one composition and
+    dealer distribution, indexed like HAND_STATES. Hit and double EVs are
+    filled in the first time a decision needs them and kept for the rest.
+    """
+    __slots__ = ('probs', 'dealer', 'stand', 'best', 'hit', 'double')
+
+    def __init__(self, probs, dealer):
+        self.probs = probs
+        self.dealer = dealer
+        # Stand EV by player total; anything under 17 only wins on a dealer bust
+        by_total = [dealer[5] - (1 - dealer[5])] * 22
+        for t in range(17, 22):
+            by_total[t] = dealer[5] + sum(dealer[:t - 17]) - sum(dealer[t - 16:5])
+        self.stand = [by_total[total] for total, _ in HAND_STATES] + [-1.0]
+        self.best = list(self.stand) # max(stand, hit) once hit is known
+        self.hit = [None] * BUST
+        self.double = [None] * BUST
+
+    def evs(self, i, can_double=True):
+        """(stand, hit, double) of state index i; double is None when not allowed."""
+        probs, best, hit = self.probs, self.best, self.hit
+        if hit[i] is None:
+            for k in REACHABLE[i]:
+                if hit[k] is not None: continue
+                ev = 0.0
+                for p, j in zip(probs, NEXT_INDEX[k]):
+                    ev += p * best[j]
+                hit[k] = ev
+                if ev > best[k]: best[k] = ev
+        ev_double = None
+        if can_double:
+            ev_double = self.double[i]
+            if ev_double is None:
+                stand = self.stand
+                ev_double = self.double[i] = 2 * sum(p * stand[j] for p, j in zip(probs, NEXT_INDEX[i]))
+        return self.stand[i], hit[i], ev_double
+
+class CompositionEV:
+    """
+    Dealer outcome distribution and player stand/hit/double EVs for a shoe
+    composition. The dealer peeks for blackjack before the player acts and
+    stands on 17, or hits soft 17 with hits_soft_17; ties push. The
+    composition is held fixed while drawing. Decisions against the same
+    (composition, upcard, rule) share one EVTable, so only the first of
+    them pays for the dealer pass and each state is evaluated once.
+    """
+    def __init__(self, cache_size=1000):
+        self.cache = LRUCache(cache_size)
+
+    def dealer_distribution(self, counts, upcard, hits_soft_17=False):
+        """Probabilities of dealer finishing on 17, 18, 19, 20, 21 or busting, given no blackjack."""
+        return self.table(counts, upcard, hits_soft_17).dealer
+
+    def table(self, counts, upcard, hits_soft_17=False):
+        """The EVTable of a composition and upcard, shared by every decision made against them."""
+        key = (counts, upcard, hits_soft_17)
+        table = self.cache.get(key)
+        if table is None:
+            n = sum(counts)
+            probs = [c / n for c in counts]
+            table = EVTable(probs, self._dealer_distribution(probs, upcard, hits_soft_17))
+            self.cache.put(key, table)
+        return table
+
+    def _dealer_distribution(self, probs, upcard, hits_soft_17):
+        # Hole card can't complete a blackjack, the round would have ended already
+        hole = list(probs)
+        if upcard == 11: hole[8] = 0.0
+        elif upcard == 10: hole[9] = 0.0
+        norm = sum(hole)
+
+        # Push probability mass forward through the dealer's drawing states,
+        # starting from upcard + hole card
+        start = STATE_INDEX[add_card(0, False, upcard)]
+        mass = [0.0] * BUST
+        mass[start] = 1.0
+        dist = [0.0] * 6
+        for i, more, done in DEALER_PLANS[hits_soft_17]:
+            m = mass[i]
+            if not m: continue
+            weights = probs
+            if i == start:
+                weights, m = hole, m / norm
+            for v, j in more:
+                mass[j] += m * weights[v]
+            for v, end in done:
+                dist[end] += m * weights[v]
+        return tuple(dist)
+
+    def evs(self, counts, upcard, total, soft, can_double=True, hits_soft_17=False):
+        """(stand, hit, double) EV per unit bet; double is None when not allowed."""
+        return self.table(counts, upcard, hits_soft_17).evs(STATE_INDEX[total, soft], can_double)
+
+    def best_action(self, counts, upcard, total, soft, can_double=True, hits_soft_17=False):
+        ev_stand, ev_hit, ev_double = self.evs(counts, upcard, total, soft, can_double, hits_soft_17)
+        action, best = 'S', ev_stand
+        if ev_hit > best: action, best = 'H', ev_hit
+        if ev_double is not None and ev_double > best: action = 'D'
+        return action
+
+# ==========================================
+# 4. Engine
+# ==========================================
+class CompositionBlackjackSimulator(BlackjackSimulator):
+    """
+    BlackjackSimulator that picks each action by EV against the shoe as it
+    was at the round's first decision. Like the counting strategies, it
+    treats every card already drawn (including the dealer's hole card) as
+    seen; cards drawn later in the round are not, so all decisions of a
+    round are served from one table.
+    """
+    def __init__(self, strategy, shoe, rules=None, evaluator=None):
+        super().__init__(strategy, shoe, rules)
+        self.evaluator = evaluator or CompositionEV()
+        self.round_counts = None
+
+    def play_round(self):
+        self.round_counts = None
+        super().play_round()
+
+    def get_action(self, player_hand, dealer_upcard):
+        if self.round_counts is None:
+            self.round_counts = value_counts(self.shoe.rank_counts())
+        upcard = dealer_upcard.get_value("blackjack")
+        return self.evaluator.best_action(self.round_counts, upcard, player_hand.score, player_hand.soft,
+                                          self.can_double(player_hand), self.rules.dealer_hits_soft_17)
+
+if __name__ == "__main__":
+    ROUNDS = 20000
+    STARTING_BANKROLL = 10**9
+    BASE_UNIT = 10
+
+    shoe = CompactShoe(num_decks=6)
+    strat = FlatBetting(STARTING_BANKROLL, BASE_UNIT)
+    game = CompositionBlackjackSimulator(strat, shoe)
+
+    # Time only the decisions, not the dealing around them
+    decisions = 0
+    decision_time = 0.0
+    get_action = game.get_action
+    def timed(*args):
+        global decisions, decision_time
+        start = time.perf_counter()
+        action = get_action(*args)
+        decision_time += time.perf_counter() - start
+        decisions += 1
+        return action
+    game.get_action = timed
+
+    for _ in range(ROUNDS):
+        game.play_round()
+
+    print(f"--- Composition-dependent Blackjack, {ROUNDS} hands ---")
+    print(f"Profit = ${strat.profit:.2f} | {decisions / decision_time:.0f} decisions/s")
+    # A hit is a decision served from the table an earlier decision of the round built
+    print(f"Cache: {game.evaluator.cache.stats()}")
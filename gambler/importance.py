@@ -0,0 +1,239 @@
+import bisect
+import itertools
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+
+import markov
+from markov import baccarat_banker_outcomes
+from runner import Trial, TrialConfig, trial_seed
+from simulator import (COUNTING_SYSTEMS, RANKS, CompactShoe, GameSimulator, HiLoCounting, Martingale,
+                       StopConditions, run_rounds)
+
+Z95 = 1.959964 # Two-sided 95% normal quantile
+
+# ==========================================
+# 1. Tilted Shoe
+# ==========================================
+class TiltedShoe(CompactShoe):
+    """
+    CompactShoe that deals with a biased composition: the next card is rank r
+    with probability proportional to weights[r] * (cards of r left) instead of
+    the cards left alone. log_ratio accumulates log(true probability / tilted
+    probability) of every card dealt, so exp(log_ratio) is the likelihood
+    ratio of the whole run. All weights 1 deals exactly like a shuffled shoe.
+    """
+    def __init__(self, num_decks=6, penetration=0.75, rng=None, weights=None):
+        self.weights = tuple(weights) if weights is not None else (1.0,) * len(RANKS)
+        if len(self.weights) != len(RANKS) or min(self.weights) <= 0:
+            raise ValueError(f"Need {len(RANKS)} positive weights, one per rank")
+        self.log_ratio = 0.0
+        super().__init__(num_decks, penetration, rng)
+
+    def shuffle(self):
+        self.counts = [self.size // len(RANKS)] * len(RANKS)
+        self.total_weight = sum(w * c for w, c in zip(self.weights, self.counts))
+        self.pos = 0
+        for callback in self.on_shuffle:
+            callback()
+
+    def draw_index(self):
+        if self.pos >= self.cut:
+            self.shuffle()
+        counts, weights = self.counts, self.weights
+        x = self.rng.random() * self.total_weight
+        rank = None
+        for r in range(len(RANKS)):
+            if counts[r]:
+                rank = r # Last rank with cards left, in case rounding runs x past the end
+                x -= weights[r] * counts[r]
+                if x < 0: break
+
+        self.log_ratio += math.log(self.total_weight / ((self.size - self.pos) * weights[rank]))
+        counts[rank] -= 1
+        self.total_weight -= weights[rank]
+        self.pos += 1
+        return rank
+
+    def rank_counts(self):
+        return list(self.counts)
+
+def exponential_tilt(scores, theta):
+    """Weights exp(theta * score / max |score|) per rank; theta 0 is no tilt."""
+    top = max(abs(s) for s in scores) or 1
+    return tuple(math.exp(theta * s / top) for s in scores)
+
+def blackjack_ruin_scores(system='hilo'):
+    """Per-rank scores that point toward losing hands: small cards (positive count weight) hurt the player."""
+    return COUNTING_SYSTEMS[system].weights
+
+class OutcomeSimulator(GameSimulator):
+    """
+    Game reduced to independent rounds paying bet * multiplier with the
+    probabilities in `outcomes` ({multiplier: probability}, see markov.py).
+    Rounds with a bet of at least min_bet draw from `tilted` instead; the
+    tilt may depend on the bet because the bet is fixed before the round.
+    log_ratio is the log likelihood ratio of the rounds played so far.
+    For progression strategies, which ignore the cards.
+    """
+    def __init__(self, strategy, outcomes, tilted=None, min_bet=0, rng=None):
+        super().__init__(strategy, None)
+        self.rng = rng if rng is not None else random
+        self.min_bet = min_bet
+        self.multipliers = list(outcomes)
+        self.plain = self._table(outcomes, outcomes)
+        self.tilted = self._table(outcomes, tilted or outcomes)
+        self.log_ratio = 0.0
+
+    def _table(self, outcomes, dist):
+        """(cumulative probabilities, log ratio per outcome) in multipliers order."""
+        for m in self.multipliers:
+            if outcomes[m] > 0 and dist.get(m, 0) <= 0:
+                raise ValueError(f"The tilt must keep outcome {m} possible")
+        cumulative = list(itertools.accumulate(dist.get(m, 0) for m in self.multipliers))
+        ratios = [math.log(outcomes[m] / dist[m]) if outcomes[m] > 0 else 0.0 for m in self.multipliers]
+        return cumulative, ratios
+
+    def play_round(self):
+        bet_amount = self.strategy.get_bet()
+        if bet_amount <= 0: return # Bankrupt
+
+        cumulative, ratios = self.tilted if bet_amount >= self.min_bet else self.plain
+        i = min(bisect.bisect(cumulative, self.rng.random() * cumulative[-1]), len(cumulative) - 1)
+        self.log_ratio += ratios[i]
+        m = self.multipliers[i]
+        self.settle(bet_amount, 'win' if m > 0 else 'loss' if m < 0 else 'push', bet_amount * m)
+
+def tilt_outcomes(outcomes, theta):
+    """Exponential tilt q(m) ~ p(m) * exp(-theta * m): theta > 0 makes losing rounds more likely."""
+    weights = {m: p * math.exp(-theta * m) for m, p in outcomes.items()}
+    total = sum(weights.values())
+    return {m: w / total for m, w in weights.items()}
+
+# ==========================================
+# 2. Estimation
+# ==========================================
+# A job plays one trial from a seed and returns (event happened, log likelihood ratio)
+@dataclass(frozen=True)
+class ShoeJob:
+    config: TrialConfig
+    weights: tuple
+    event: str = 'ruin'
+
+    def __call__(self, seed):
+        config = replace(self.config, shoe_cls=partial(TiltedShoe, weights=self.weights))
+        trial = Trial(config, seed)
+        trial.advance(config.rounds)
+        return trial.reason == self.event, trial.game.shoe.log_ratio
+
+@dataclass(frozen=True)
+class OutcomeJob:
+    strategy_cls: type
+    params: dict
+    outcomes: dict
+    tilted: dict
+    min_bet: float = 0
+    rounds: int = 1000
+    stop: StopConditions = None
+    event: str = 'ruin'
+
+    def __call__(self, seed):
+        game = OutcomeSimulator(self.strategy_cls(**self.params), self.outcomes, self.tilted, self.min_bet,
+                                random.Random(seed))
+        _, reason = run_rounds(game, self.rounds, self.stop)
+        return reason == self.event, game.log_ratio
+
+def _run_chunk(job, master_seed, trials):
+    return {t: job(trial_seed(master_seed, t)) for t in trials}
+
+def estimate(job, trials, seed=0, workers=None):
+    """
+    Importance-sampling estimate of the probability of job's event. Every
+    trial runs under the tilted distribution and a hit counts with its
+    likelihood ratio, so the estimate is unbiased for any tilt that keeps
+    every outcome possible; a good tilt makes the event common and the ratios small.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, trials // (workers * 4))
+    chunks = [list(range(start, min(start + chunk_size, trials))) for start in range(0, trials, chunk_size)]
+    done = {}
+    if workers == 1:
+        for chunk in chunks:
+            done.update(_run_chunk(job, seed, chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for f in [pool.submit(_run_chunk, job, seed, chunk) for chunk in chunks]:
+                done.update(f.result())
+    return summarize([done[t] for t in range(trials)])
+
+def summarize(results):
+    """Aggregates (hit, log likelihood ratio) pairs."""
+    ratios = [math.exp(log_ratio) for _, log_ratio in results]
+    values = [ratio if hit else 0.0 for (hit, _), ratio in zip(results, ratios)]
+    n = len(values)
+    mean = statistics.fmean(values)
+    stdev = statistics.stdev(values) if n > 1 else 0.0
+    half = Z95 * stdev / math.sqrt(n)
+    hit_ratios = [v for v in values if v]
+    return {
+        'trials': n,
+        'estimate': mean,
+        'stdev': stdev,
+        'ci_low': max(0.0, mean - half),
+        'ci_high': mean + half,
+        'relative_error': stdev / math.sqrt(n) / mean if mean else float('inf'),
+        'hits': len(hit_ratios),
+        # Kish effective sample size of the weighted hits: how many plain hits they are worth
+        'ess': sum(hit_ratios) ** 2 / sum(r * r for r in hit_ratios) if hit_ratios else 0.0,
+        # Should stay near 1; far off means the tilt is too strong for this many trials
+        'mean_likelihood_ratio': statistics.fmean(ratios),
+    }
+
+def choose_tilt(make_job, candidates, pilot_trials=200, seed=0, workers=None):
+    """Candidate whose job, make_job(candidate), has the lowest relative error in short pilot runs."""
+    best = None
+    for candidate in candidates:
+        res = estimate(make_job(candidate), pilot_trials, seed, workers)
+        if res['hits'] and (best is None or res['relative_error'] < best[1]['relative_error']):
+            best = candidate, res
+    return best[0] if best else candidates[0]
+
+def print_estimate(name, res, seconds=None):
+    timing = f" | {seconds:.1f}s" if seconds is not None else ""
+    print(f"{name}: P = {res['estimate']:.3e} [{res['ci_low']:.3e}, {res['ci_high']:.3e}] | "
+          f"rel. error {res['relative_error']:.1%} | ESS {res['ess']:.0f} of {res['hits']} hits | "
+          f"mean LR {res['mean_likelihood_ratio']:.3f}{timing}")
+
+if __name__ == "__main__":
+    ROUNDS = 1000
+    TRIALS = 2000
+
+    print(f"--- Martingale ruin within {ROUNDS} hands, $5000 bankroll, $1 base unit ---")
+    outcomes = baccarat_banker_outcomes()
+    params = {'bankroll': 5000, 'base_unit': 1}
+    exact = markov.analyze(Martingale(**params), outcomes, ROUNDS)['ruin_probability']
+    print(f"Markov chain (exact): P = {exact:.3e}")
+
+    # Tilt toward losses only once a losing streak has pushed the bet up to min_bet
+    make_job = lambda tilt: OutcomeJob(Martingale, params, outcomes, tilt_outcomes(outcomes, tilt[0]), tilt[1], ROUNDS)
+    tilt = choose_tilt(make_job, [(theta, min_bet) for theta in (0.5, 1.0) for min_bet in (64, 256, 1024)], workers=1)
+    start = time.perf_counter()
+    print_estimate(f"Importance sampling (theta {tilt[0]}, min bet ${tilt[1]})",
+                   estimate(make_job(tilt), TRIALS, seed=42), time.perf_counter() - start)
+    start = time.perf_counter()
+    print_estimate("Plain Monte Carlo", estimate(make_job((0.0, 0)), TRIALS, seed=42), time.perf_counter() - start)
+
+    # Card-level tilt: every card dealt enters the ratio, so keep runs short and theta small
+    SHORT = 100
+    print(f"--- Hi-Lo ruin within {SHORT} hands, $400 bankroll, $10 base unit ---")
+    config = TrialConfig('blackjack', HiLoCounting, {'bankroll': 400, 'base_unit': 10}, SHORT, num_decks=6)
+    scores = blackjack_ruin_scores()
+    make_job = lambda theta: ShoeJob(config, exponential_tilt(scores, theta))
+    theta = choose_tilt(make_job, (0.0, 0.05, 0.1), workers=1)
+    print_estimate(f"Importance sampling (theta {theta})", estimate(make_job(theta), TRIALS, seed=42))
+    print_estimate("Plain Monte Carlo", estimate(make_job(0.0), TRIALS, seed=42))
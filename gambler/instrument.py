@@ -0,0 +1,150 @@
+import argparse
+import cProfile
+import io
+import pstats
+import time
+
+from simulator import (BaccaratSimulator, BlackjackSimulator, CompactShoe, FlatBetting, HiLoCounting,
+                       Martingale, simulate)
+
+# ==========================================
+# 1. Per-Phase Timers
+# ==========================================
+# (owner attribute on the game, method name, phase) wrapped by attach(); a list owner wraps each item.
+# Blackjack hands keep their score up to date in Hand.append, so only baccarat has a score phase.
+HOOKS = (
+    ('shoe', 'draw', 'draw'),
+    ('shoe', 'shuffle', 'shuffle'),
+    (None, 'baccarat_score', 'score'),
+    (None, 'get_action', 'get_action'),
+    ('seats', 'observe_card', 'observe_card'),
+    ('seats', 'update_after_result', 'update_after_result'),
+)
+
+class Instrumentation:
+    """
+    Opt-in timers and call counters for the hot paths of a game. attach()
+    swaps the instance methods for timed wrappers and detach() puts them
+    back, so a game that was never attached runs the plain code.
+    Times are inclusive: a reshuffle triggered inside draw also counts as draw time.
+    """
+    def __init__(self):
+        self.phases = {} # phase -> [calls, total ns]
+        self._patched = []
+
+    def attach(self, game):
+        for owner, name, phase in HOOKS:
+            obj = getattr(game, owner) if owner else game
+            for target in obj if isinstance(obj, list) else [obj]:
+                if hasattr(target, name):
+                    self._wrap(target, name, phase)
+        return self
+
+    def detach(self):
+        for obj, name, original, own in reversed(self._patched):
+            if own: setattr(obj, name, original)
+            else: delattr(obj, name)
+        self._patched.clear()
+
+    def _wrap(self, obj, name, phase):
+        own = name in vars(obj) # Already an instance attribute (e.g. wrapped by someone else)
+        original = getattr(obj, name)
+        stats = self.phases.setdefault(phase, [0, 0])
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += clock() - start
+
+        setattr(obj, name, timed)
+        self._patched.append((obj, name, original, own))
+
+    # ==========================================
+    # 2. Export
+    # ==========================================
+    def as_dict(self):
+        hands = self.phases.get('update_after_result', [0, 0])[0]
+        shuffles = self.phases.get('shuffle', [0, 0])[0]
+        return {
+            'hands': hands,
+            'reshuffles_per_1000_hands': shuffles / hands * 1000 if hands else 0.0,
+            'phases': {
+                phase: {'calls': calls, 'seconds': ns / 1e9, 'ns_per_call': ns / calls if calls else 0.0}
+                for phase, (calls, ns) in self.phases.items()
+            },
+        }
+
+    def to_prometheus(self, prefix='gambler'):
+        data = self.as_dict()
+        lines = [
+            f"# HELP {prefix}_phase_calls_total Calls per instrumented phase.",
+            f"# TYPE {prefix}_phase_calls_total counter",
+        ]
+        lines += [f'{prefix}_phase_calls_total{{phase="{p}"}} {v["calls"]}' for p, v in data['phases'].items()]
+        lines += [
+            f"# HELP {prefix}_phase_seconds_total Time spent per instrumented phase.",
+            f"# TYPE {prefix}_phase_seconds_total counter",
+        ]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{p}"}} {v["seconds"]:.9f}' for p, v in data['phases'].items()]
+        lines += [
+            f"# HELP {prefix}_hands_total Settled hands.",
+            f"# TYPE {prefix}_hands_total counter",
+            f"{prefix}_hands_total {data['hands']}",
+            f"# HELP {prefix}_reshuffles_per_1000_hands Shoe reshuffles per 1000 hands.",
+            f"# TYPE {prefix}_reshuffles_per_1000_hands gauge",
+            f"{prefix}_reshuffles_per_1000_hands {data['reshuffles_per_1000_hands']:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+# ==========================================
+# 3. Profiler Entry Point
+# ==========================================
+def profile_simulate(strat, rounds=1000, profiler='cprofile', top=20):
+    """Runs simulator.simulate under cProfile or pyinstrument and returns the report text."""
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed (pip install pyinstrument)")
+        prof = Profiler()
+        prof.start()
+        simulate(strat, rounds, CompactShoe)
+        prof.stop()
+        return prof.output_text()
+
+    prof = cProfile.Profile()
+    prof.runcall(simulate, strat, rounds, CompactShoe)
+    out = io.StringIO()
+    pstats.Stats(prof, stream=out).sort_stats('tottime').print_stats(top)
+    return out.getvalue()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instrument or profile the gambler engines.")
+    parser.add_argument('--rounds', type=int, default=10000)
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'], help="profile simulate() instead")
+    parser.add_argument('--prometheus', action='store_true', help="print Prometheus text instead of a summary")
+    args = parser.parse_args()
+
+    if args.profile:
+        print(profile_simulate(Martingale(10**9, 10), args.rounds, args.profile))
+    else:
+        bj_shoe = CompactShoe(num_decks=6)
+        for game in (BaccaratSimulator(FlatBetting(10**9, 10), CompactShoe(num_decks=8)),
+                     BlackjackSimulator(HiLoCounting(10**9, 10, shoe_ref=bj_shoe), bj_shoe)):
+            inst = Instrumentation().attach(game)
+            for _ in range(args.rounds):
+                game.play_round()
+            inst.detach()
+
+            name = game.__class__.__name__
+            if args.prometheus:
+                print(inst.to_prometheus(prefix=f"gambler_{name.lower()}"))
+                continue
+            data = inst.as_dict()
+            print(f"--- {name}: {data['hands']} hands, {data['reshuffles_per_1000_hands']:.2f} reshuffles / 1000 hands ---")
+            for phase, v in data['phases'].items():
+                print(f"{phase:<20} {v['calls']:>8} calls {v['seconds'] * 1000:>9.2f} ms {v['ns_per_call']:>8.0f} ns/call")
@@ -0,0 +1,174 @@
+import time
+
+import numpy as np
+
+from baccarat_exact import analyze as baccarat_odds
+from runner import TrialConfig, run_monte_carlo
+from simulator import CountingStrategy, Fibonacci, Martingale, PositiveStableFibonacci, StopConditions
+
+# ==========================================
+# 1. Outcome Distributions
+# ==========================================
+def baccarat_banker_outcomes(rank_counts=None):
+    """{bet multiplier: probability} of one Banker bet, as BaccaratSimulator plays it."""
+    odds = baccarat_odds(rank_counts)
+    return {0.95: odds['banker'], -1.0: odds['player'], 0.0: odds['tie']}
+
+def win_push_loss(win, push, loss, payout=1.0):
+    return {payout: win, 0.0: push, -1.0: loss}
+
+# ==========================================
+# 2. Dynamic Programming over (bankroll, state)
+# ==========================================
+NONE, RUIN, WIN_GOAL, STOP_LOSS = 0, 1, 2, 3
+REASONS = {RUIN: 'ruin', WIN_GOAL: 'win_goal', STOP_LOSS: 'stop_loss'}
+
+def analyze(strategy, outcomes, rounds, stop=None, resolution=None, tolerance=0.0):
+    """
+    Exact distribution of `strategy` after `rounds` independent rounds, where
+    every round pays bet * multiplier with the probabilities in `outcomes`
+    ({multiplier: probability}, e.g. from baccarat_banker_outcomes()).
+
+    The chain runs over (bankroll, progression state), using the strategy's
+    transition() and bet_in_state(). States are discovered as probability
+    reaches them and each holds a vector over a bankroll grid of `resolution`
+    (default base_unit / 20, exact for 0.95 and 1.5 payouts of whole units;
+    only bets capped at an odd bankroll get rounded). Ruin, win_goal and
+    stop_loss of `stop` are absorbing. Entries below `tolerance` are dropped
+    and reported as dropped_mass.
+    """
+    if isinstance(strategy, CountingStrategy):
+        raise TypeError("Counting strategies bet on the shoe, not on a progression state")
+    stop = stop or StopConditions()
+    if stop.max_drawdown is not None:
+        raise ValueError("max_drawdown depends on the peak bankroll and is not supported")
+
+    scale = 1 / (resolution or strategy.base_unit / 20)
+    start = round(strategy.bankroll * scale)
+    goal = start + round(stop.win_goal * scale) if stop.win_goal is not None else None
+    floor = start - round(stop.stop_loss * scale) if stop.stop_loss is not None else None
+    outcomes = [(m, p) for m, p in outcomes.items() if p > 0]
+    max_gain = max(max(m for m, _ in outcomes), 0)
+
+    size = start + 1
+    bets = {}
+    moves = {}
+    targets = {}
+    def step(state):
+        """[(multiplier, probability, next state)] from state, memoized."""
+        if state not in moves:
+            bets[state] = round(strategy.bet_in_state(state) * scale)
+            moves[state] = [(m, p, strategy.transition(state, m)) for m, p in outcomes]
+        return moves[state]
+
+    def capped(state, m):
+        """Grid index reached from each bankroll index below the bet, where get_bet bets the whole bankroll."""
+        key = state, m, min(bets[state], size)
+        if key not in targets:
+            grid = np.arange(key[2])
+            targets[key] = grid + np.rint(grid * m).astype(np.int64)
+        return targets[key]
+
+    def absorbing():
+        """Grid indices where each stop reason ends the run, in StopConditions.check order."""
+        codes = np.full(size, NONE, dtype=np.int8)
+        if floor is not None: codes[:max(floor + 1, 0)] = STOP_LOSS
+        if goal is not None: codes[goal:] = WIN_GOAL
+        if stop.ruin: codes[0] = RUIN
+        return {reason: np.flatnonzero(codes == reason) for reason in REASONS}
+
+    alive = {strategy.progression_state(): np.zeros(size)}
+    alive[strategy.progression_state()][start] = 1.0
+    finished = {reason: np.zeros(size) for reason in REASONS}
+    stops = absorbing()
+    for reason, where in stops.items():
+        if start in where:
+            finished[reason][start] = 1.0
+            alive = {}
+
+    ruin_curve = []
+    expected_rounds = 0.0
+    dropped = 0.0
+    for _ in range(rounds):
+        if not alive: break
+        expected_rounds += sum(vec.sum() for vec in alive.values())
+
+        # Grow the grid so the richest bankroll can still win
+        for state in alive: step(state)
+        top = max(np.flatnonzero(vec)[-1] for vec in alive.values())
+        needed = top + 1 + max(round(bets[s] * max_gain) for s in alive)
+        if needed > size:
+            grow = max(needed - size, size // 4)
+            size += grow
+            alive = {s: np.concatenate([vec, np.zeros(grow)]) for s, vec in alive.items()}
+            finished = {r: np.concatenate([vec, np.zeros(grow)]) for r, vec in finished.items()}
+            stops = absorbing()
+
+        # Above the bet every bankroll moves by the same amount, a shifted slice;
+        # below it the whole bankroll is staked and each index moves on its own
+        nxt = {}
+        for state, vec in alive.items():
+            bet = bets[state]
+            for m, p, new_state in step(state):
+                if new_state not in nxt: nxt[new_state] = np.zeros(size)
+                out = nxt[new_state]
+                if bet <= top:
+                    shift = round(bet * m)
+                    out[bet + shift:top + 1 + shift] += vec[bet:top + 1] * p
+                low = capped(state, m)[:top + 1]
+                np.add.at(out, low, vec[:len(low)] * p)
+
+        alive = {}
+        for state, vec in nxt.items():
+            if tolerance:
+                small = (vec > 0) & (vec < tolerance)
+                dropped += vec[small].sum()
+                vec[small] = 0.0
+            for reason, where in stops.items():
+                finished[reason][where] += vec[where]
+                vec[where] = 0.0
+            if vec.any():
+                alive[state] = vec
+        ruin_curve.append(finished[RUIN].sum())
+
+    total = sum(finished.values()) + sum(alive.values(), np.zeros(size))
+    support = np.flatnonzero(total)
+    distribution = dict(zip((support / scale).tolist(), total[support].tolist()))
+    return {
+        'distribution': distribution,
+        'ruin_probability': float(finished[RUIN].sum()),
+        'ruin_curve': ruin_curve,
+        'expected_rounds': float(expected_rounds),
+        'mean_bankroll': float((np.arange(size) / scale * total).sum()),
+        'stop_reasons': {name: float(finished[r].sum()) for r, name in REASONS.items() if finished[r].any()},
+        'states': len(moves),
+        'dropped_mass': float(dropped),
+    }
+
+def tail_probability(distribution, threshold):
+    """P(final bankroll <= threshold)."""
+    return sum(p for bankroll, p in distribution.items() if bankroll <= threshold)
+
+if __name__ == "__main__":
+    ROUNDS = 1000
+    STARTING_BANKROLL = 5000
+    BASE_UNIT = 10
+    TRIALS = 2000
+
+    outcomes = baccarat_banker_outcomes()
+    print(f"--- Baccarat Banker bet, {ROUNDS} hands, ${STARTING_BANKROLL} bankroll ---")
+    for cls in (Martingale, Fibonacci, PositiveStableFibonacci):
+        start = time.perf_counter()
+        res = analyze(cls(STARTING_BANKROLL, BASE_UNIT), outcomes, ROUNDS)
+        exact_time = time.perf_counter() - start
+        print(f"{cls.__name__} (exact): ruin {res['ruin_probability']:.4%} | "
+              f"mean profit ${res['mean_bankroll'] - STARTING_BANKROLL:.2f} | "
+              f"{res['expected_rounds']:.1f} hands avg | {len(res['distribution'])} bankrolls | {exact_time:.2f}s")
+
+        # Monte Carlo deals from a finite shoe, so it agrees only up to sampling error and shoe effects
+        start = time.perf_counter()
+        mc = run_monte_carlo(TrialConfig('baccarat', cls, {'bankroll': STARTING_BANKROLL, 'base_unit': BASE_UNIT},
+                                         ROUNDS), TRIALS, seed=42)
+        print(f"{cls.__name__} (Monte Carlo, {TRIALS} trials): ruin {mc['ruin_probability']:.2%} | "
+              f"mean profit ${mc['mean_profit']:.2f} | {mc['mean_rounds']:.1f} hands avg | "
+              f"{time.perf_counter() - start:.2f}s")
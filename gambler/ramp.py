@@ -0,0 +1,198 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from basic_strategy import BasicStrategySimulator
+from runner import trial_seed
+from simulator import BetRamp, BlackjackRules, CompactShoe, HiLoCounting
+
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ramp_tables')
+COUNT_RANGE = 8 # True counts beyond +-8 are rare; they are pooled into the end bins
+
+# ==========================================
+# 1. EV / Variance by True Count
+# ==========================================
+def table_key(rules, penetration):
+    described = {'rules': vars(rules), 'penetration': penetration, 'engine': BasicStrategySimulator.__name__}
+    return hashlib.sha256(json.dumps(described, sort_keys=True).encode()).hexdigest()[:16]
+
+def _play(rules, penetration, rounds, seed):
+    """[hands, sum, sum of squares] of the per-unit result at each true count, from one flat 1-unit run."""
+    shoe = CompactShoe(rules.num_decks, penetration, random.Random(seed))
+    counter = HiLoCounting(10**12, 1, shoe_ref=shoe, ramp=BetRamp([(0, 1)]))
+    game = BasicStrategySimulator(counter, shoe, rules)
+    stats = {tc: [0, 0.0, 0.0] for tc in range(-COUNT_RANGE, COUNT_RANGE + 1)}
+    for _ in range(rounds):
+        tc = max(-COUNT_RANGE, min(COUNT_RANGE, counter.true_count()))
+        before = counter.bankroll
+        game.play_round()
+        net = counter.bankroll - before
+        entry = stats[tc]
+        entry[0] += 1
+        entry[1] += net
+        entry[2] += net * net
+    return stats
+
+def build_table(rules, penetration=0.75, rounds=2_000_000, seed=0, workers=None):
+    """Plays `rounds` flat-bet hands and tabulates hands, EV and variance per unit by true count."""
+    workers = workers or os.cpu_count() or 1
+    parts = workers * 4
+    sizes = [rounds // parts + (1 if i < rounds % parts else 0) for i in range(parts)]
+    args = [(rules, penetration, n, trial_seed(seed, i)) for i, n in enumerate(sizes) if n]
+    if workers == 1:
+        results = [_play(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play, *zip(*args)))
+
+    table = {}
+    for tc in range(-COUNT_RANGE, COUNT_RANGE + 1):
+        hands = sum(r[tc][0] for r in results)
+        total = sum(r[tc][1] for r in results)
+        squares = sum(r[tc][2] for r in results)
+        ev = total / hands if hands else 0.0
+        table[tc] = {
+            'hands': hands,
+            'frequency': hands / rounds,
+            'ev': ev,
+            'variance': squares / hands - ev * ev if hands else 0.0,
+        }
+    return table
+
+def load_table(rules, penetration=0.75, rounds=2_000_000, seed=0, workers=None, table_dir=TABLE_DIR):
+    """
+    Table for these rules from table_dir, built and saved first if there is
+    none yet or the saved one was built from fewer than `rounds` hands.
+    """
+    path = os.path.join(table_dir, f"{table_key(rules, penetration)}.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+        if saved['rounds'] >= rounds:
+            return {int(tc): entry for tc, entry in saved['table'].items()}
+
+    table = build_table(rules, penetration, rounds, seed, workers)
+    os.makedirs(table_dir, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'rules': vars(rules), 'penetration': penetration, 'rounds': rounds, 'seed': seed,
+                   'table': table}, f, indent=2)
+    os.replace(tmp, path)
+    return table
+
+def smoothed(table):
+    """
+    Copy of table with each EV replaced by a hands-weighted straight-line fit
+    over the true count, which the edge follows closely; the raw bins are
+    noisy at the rare high counts the ramp cares most about.
+    """
+    n = sum(e['hands'] for e in table.values())
+    mean_tc = sum(tc * e['hands'] for tc, e in table.items()) / n
+    mean_ev = sum(e['ev'] * e['hands'] for e in table.values()) / n
+    cov = sum(e['hands'] * (tc - mean_tc) * (e['ev'] - mean_ev) for tc, e in table.items())
+    var = sum(e['hands'] * (tc - mean_tc) ** 2 for tc, e in table.items())
+    slope = cov / var if var else 0.0
+    return {tc: dict(e, ev=mean_ev + slope * (tc - mean_tc)) for tc, e in table.items()}
+
+# ==========================================
+# 2. Ramp Optimizer
+# ==========================================
+def ramp_stats(table, ramp, base_unit):
+    """Per-round EV and variance in money of betting `ramp`, from the table."""
+    ev = var = 0.0
+    for tc, entry in table.items():
+        bet = ramp.units(tc) * base_unit
+        ev += entry['frequency'] * entry['ev'] * bet
+        var += entry['frequency'] * (entry['variance'] + entry['ev'] ** 2) * bet * bet
+    return ev, var - ev * ev
+
+def risk_of_ruin(ev, variance, bankroll):
+    """Diffusion approximation of the chance of ever losing `bankroll` at this per-round EV and variance."""
+    if ev <= 0: return 1.0
+    return math.exp(-2 * ev * bankroll / variance)
+
+def kelly_ramp(table, bankroll, base_unit, max_units, kelly_fraction=1.0, min_units=1):
+    """
+    BetRamp betting kelly_fraction * edge / variance of the bankroll at every
+    true count with an edge, rounded to whole units within [min_units, max_units]
+    and never lower than at a smaller count.
+    """
+    steps = []
+    units = min_units
+    for tc in sorted(table):
+        entry = table[tc]
+        if entry['ev'] > 0 and entry['variance'] > 0:
+            kelly = kelly_fraction * entry['ev'] / entry['variance'] * bankroll / base_unit
+            units = max(units, min(max_units, round(kelly)))
+        steps.append((tc, units))
+    return BetRamp(steps, min_units)
+
+def solve_ramp(table, bankroll, base_unit, max_units, max_ror=None, min_units=1):
+    """
+    Full Kelly ramp, or with max_ror the largest Kelly fraction whose ramp keeps
+    the risk of ruin at or below it. Returns (ramp, kelly fraction, stats dict),
+    or None when not even the smallest ramp meets max_ror.
+    Pass smoothed(table) unless the table was built from a very large number of hands.
+    """
+    def evaluate(fraction):
+        ramp = kelly_ramp(table, bankroll, base_unit, max_units, fraction, min_units)
+        ev, var = ramp_stats(table, ramp, base_unit)
+        return ramp, {'ev_per_round': ev, 'stdev_per_round': math.sqrt(var),
+                      'risk_of_ruin': risk_of_ruin(ev, var, bankroll)}
+
+    fraction = 1.0
+    ramp, stats = evaluate(fraction)
+    if max_ror is not None and stats['risk_of_ruin'] > max_ror:
+        lo, hi = 0.0, 1.0
+        for _ in range(30):
+            mid = (lo + hi) / 2
+            if evaluate(mid)[1]['risk_of_ruin'] <= max_ror: lo = mid
+            else: hi = mid
+        fraction = lo
+        ramp, stats = evaluate(fraction)
+        if stats['risk_of_ruin'] > max_ror:
+            return None
+    return ramp, fraction, stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an EV-by-true-count table and solve for a Hi-Lo bet ramp.")
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--h17', action='store_true', help="dealer hits soft 17")
+    parser.add_argument('--surrender', action='store_true')
+    parser.add_argument('--penetration', type=float, default=0.75)
+    parser.add_argument('--rounds', type=int, default=2_000_000, help="hands behind the table")
+    parser.add_argument('--bankroll', type=float, default=10000)
+    parser.add_argument('--base-unit', type=float, default=10)
+    parser.add_argument('--max-units', type=int, default=12)
+    parser.add_argument('--max-ror', type=float, help="cap on the risk of ruin, e.g. 0.05")
+    parser.add_argument('--verify', type=int, default=0, help="hands to play with the solved ramp")
+    args = parser.parse_args()
+
+    rules = BlackjackRules(num_decks=args.decks, dealer_hits_soft_17=args.h17, surrender=args.surrender)
+    start = time.perf_counter()
+    table = load_table(rules, args.penetration, args.rounds)
+    print(f"EV table ready in {time.perf_counter() - start:.1f}s")
+    for tc, entry in sorted(table.items()):
+        print(f"TC {tc:+3d}: {entry['frequency']:7.2%} of hands | EV {entry['ev']:+.4f} | var {entry['variance']:.3f}")
+
+    solved = solve_ramp(smoothed(table), args.bankroll, args.base_unit, args.max_units, args.max_ror)
+    if solved is None:
+        raise SystemExit(f"No ramp keeps the risk of ruin at or below {args.max_ror:.2%} with this bankroll.")
+    ramp, fraction, stats = solved
+    print(f"--- Ramp (Kelly fraction {fraction:.2f}) ---")
+    print(" ".join(f"{tc:+d}:{units}" for tc, units in ramp.steps))
+    print(f"EV ${stats['ev_per_round']:.3f}/hand | stdev ${stats['stdev_per_round']:.2f}/hand | "
+          f"risk of ruin {stats['risk_of_ruin']:.2%}")
+
+    if args.verify:
+        shoe = CompactShoe(args.decks, args.penetration)
+        strat = HiLoCounting(10**12, args.base_unit, shoe_ref=shoe, ramp=ramp)
+        game = BasicStrategySimulator(strat, shoe, rules)
+        for _ in range(args.verify):
+            game.play_round()
+        print(f"Played {args.verify} hands: ${strat.profit / args.verify:.3f}/hand")
@@ -0,0 +1,240 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import random
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from simulator import (BaccaratSimulator, BlackjackSimulator, CompactShoe, FlatBetting, Martingale, Fibonacci,
+                       HiLoCounting, StopConditions)
+
+GAMES = {
+    'baccarat': BaccaratSimulator,
+    'blackjack': BlackjackSimulator,
+}
+
+# ==========================================
+# 1. Trial Configuration
+# ==========================================
+@dataclass(frozen=True)
+class TrialConfig:
+    game: str
+    strategy_cls: type
+    params: dict = field(default_factory=dict) # Passed to strategy_cls(**params)
+    rounds: int = 1000
+    num_decks: int = 8
+    penetration: float = 0.75
+    shoe_cls: type = CompactShoe
+    stop: StopConditions = None # Defaults to stopping on ruin only
+
+def config_key(config):
+    """Plain JSON-able description of a config, stable across runs."""
+    return {
+        'game': config.game,
+        'strategy': config.strategy_cls.__name__,
+        'params': config.params,
+        'rounds': config.rounds,
+        'num_decks': config.num_decks,
+        'penetration': config.penetration,
+        'shoe': config.shoe_cls.__name__,
+        'stop': vars(config.stop) if config.stop else None,
+    }
+
+def trial_seed(master_seed, trial):
+    """Seed of one trial. Depends only on (master_seed, trial), never on which worker runs it."""
+    digest = hashlib.sha256(f"{master_seed}:{trial}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def make_game(game, strategy_cls, params, shoe):
+    params = dict(params)
+    # Counting strategies need to see the shoe they are counting
+    if 'shoe_ref' in inspect.signature(strategy_cls).parameters:
+        params['shoe_ref'] = shoe
+    return GAMES[game](strategy_cls(**params), shoe)
+
+def build_game(config, rng):
+    shoe = config.shoe_cls(num_decks=config.num_decks, penetration=config.penetration, rng=rng)
+    return make_game(config.game, config.strategy_cls, config.params, shoe)
+
+class Trial:
+    """One trial in progress. Picklable (shoe, RNG and strategy included), so it can be checkpointed."""
+    def __init__(self, config, seed):
+        self.config = config
+        self.game = build_game(config, random.Random(seed))
+        self.stop = config.stop or StopConditions()
+        self.played = 0
+        self.peak = self.game.strategy.bankroll
+        self.reason = self.stop.check(self.game.strategy, self.peak)
+
+    @property
+    def finished(self):
+        return self.reason is not None or self.played >= self.config.rounds
+
+    def advance(self, rounds):
+        """Plays up to `rounds` more rounds, ending at once when a stop condition is met."""
+        strategy = self.game.strategy
+        play = self.game.play_round
+        end = min(self.config.rounds, self.played + rounds)
+        while self.reason is None and self.played < end:
+            play()
+            self.played += 1
+            if strategy.bankroll > self.peak: self.peak = strategy.bankroll
+            self.reason = self.stop.check(strategy, self.peak)
+
+    def result(self):
+        return self.game.strategy.profit, self.game.strategy.bankroll, self.played, self.reason
+
+def run_trial(config, seed, checkpoint_path=None, checkpoint_every=100_000):
+    """
+    Runs one trial to the end. With checkpoint_path the trial is pickled every
+    `checkpoint_every` rounds and picked up from that file if it already exists.
+    """
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'rb') as f:
+            trial = pickle.load(f)
+    else:
+        trial = Trial(config, seed)
+
+    while not trial.finished:
+        trial.advance(checkpoint_every if checkpoint_path else config.rounds)
+        if checkpoint_path and not trial.finished:
+            _atomic_write(checkpoint_path, pickle.dumps(trial))
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return trial.result()
+
+def _atomic_write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _run_chunk(config, master_seed, trials, checkpoint_dir=None, checkpoint_every=100_000):
+    if not checkpoint_dir:
+        return {t: run_trial(config, trial_seed(master_seed, t)) for t in trials}
+
+    # Finished trials are appended one line each, so an interruption loses at most the trial in progress
+    results = {}
+    with open(os.path.join(checkpoint_dir, f"results_{trials[0]}.jsonl"), 'a') as log:
+        for t in trials:
+            path = os.path.join(checkpoint_dir, f"trial_{t}.pkl")
+            results[t] = run_trial(config, trial_seed(master_seed, t), path, checkpoint_every)
+            log.write(json.dumps({'trial': t, 'result': results[t]}) + "\n")
+            log.flush()
+    return results
+
+def _load_checkpoints(checkpoint_dir, config, trials, seed):
+    """Finished trial results from an earlier run of the same batch."""
+    manifest = {'config': config_key(config), 'trials': trials, 'seed': seed}
+    path = os.path.join(checkpoint_dir, 'manifest.json')
+    if os.path.exists(path):
+        with open(path) as f:
+            if json.load(f) != manifest:
+                raise ValueError(f"{checkpoint_dir} holds checkpoints of a different batch")
+    else:
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    done = {}
+    for log in glob.glob(os.path.join(checkpoint_dir, 'results_*.jsonl')):
+        with open(log) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # Line cut short by the interruption
+                done[entry['trial']] = tuple(entry['result'])
+    return done
+
+# ==========================================
+# 2. Aggregation
+# ==========================================
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+def percentile(sorted_values, q):
+    """Linear interpolation between closest ranks, q in 0-100."""
+    k = (len(sorted_values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(results):
+    """Aggregates (profit, bankroll, rounds played, stop reason) tuples."""
+    profits = sorted(res[0] for res in results)
+    ruined = sum(1 for res in results if res[1] <= 0)
+    return {
+        'trials': len(results),
+        'mean_profit': statistics.fmean(profits),
+        'median_profit': statistics.median(profits),
+        'stdev_profit': statistics.stdev(profits) if len(profits) > 1 else 0.0,
+        'percentiles': {q: percentile(profits, q) for q in PERCENTILES},
+        'ruin_probability': ruined / len(results),
+        'mean_rounds': statistics.fmean(res[2] for res in results),
+        'stop_reasons': dict(Counter(res[3] for res in results if res[3] is not None)),
+    }
+
+# ==========================================
+# 3. Process Pool Runner
+# ==========================================
+def run_monte_carlo(config, trials, seed=0, workers=None, chunk_size=None, checkpoint_dir=None,
+                    checkpoint_every=100_000, progress=None):
+    """
+    Runs `trials` independent trials of `config` and returns summarize() of them.
+    Each trial gets its own random.Random seeded from (seed, trial index), and
+    results are combined in trial order, so the output is the same for any
+    number of workers. With checkpoint_dir, finished trials and the state of
+    trials in progress are kept on disk and a rerun continues where it stopped.
+    progress(finished trials, trials) is called at the start and after every chunk.
+    """
+    done = {}
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        done = _load_checkpoints(checkpoint_dir, config, trials, seed)
+    todo = [t for t in range(trials) if t not in done]
+    if progress: progress(len(done), trials)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, len(todo) // (workers * 4))
+    chunks = [todo[start:start + chunk_size] for start in range(0, len(todo), chunk_size)]
+    if workers == 1:
+        for chunk in chunks:
+            done.update(_run_chunk(config, seed, chunk, checkpoint_dir, checkpoint_every))
+            if progress: progress(len(done), trials)
+    elif chunks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, config, seed, chunk, checkpoint_dir, checkpoint_every)
+                       for chunk in chunks]
+            for f in as_completed(futures):
+                done.update(f.result())
+                if progress: progress(len(done), trials)
+    return summarize([done[t] for t in range(trials)])
+
+def print_summary(name, summary):
+    pct = summary['percentiles']
+    print(f"{name}: mean ${summary['mean_profit']:.2f} | median ${summary['median_profit']:.2f} | "
+          f"stdev ${summary['stdev_profit']:.2f} | P5 ${pct[5]:.2f} | P95 ${pct[95]:.2f} | "
+          f"ruin {summary['ruin_probability']:.2%} | {summary['mean_rounds']:.0f} hands avg")
+
+if __name__ == "__main__":
+    ROUNDS = 1000
+    TRIALS = 2000
+    STARTING_BANKROLL = 5000
+    BASE_UNIT = 10
+    SEED = 42
+
+    print(f"--- {TRIALS} trials of {ROUNDS} hands ---")
+    params = {'bankroll': STARTING_BANKROLL, 'base_unit': BASE_UNIT}
+    for game, strategy_cls in [
+        ('baccarat', FlatBetting),
+        ('baccarat', Martingale),
+        ('baccarat', Fibonacci),
+        ('blackjack', HiLoCounting),
+    ]:
+        config = TrialConfig(game, strategy_cls, params, ROUNDS, num_decks=8 if game == 'baccarat' else 6)
+        print_summary(f"{game} ({strategy_cls.__name__})", run_monte_carlo(config, TRIALS, SEED))
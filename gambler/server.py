@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import queue
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from runner import GAMES, TrialConfig, config_key, run_monte_carlo
+from simulator import Fibonacci, FlatBetting, HiLoCounting, Martingale, PositiveStableFibonacci, StopConditions
+
+STRATEGIES = {cls.__name__: cls for cls in (FlatBetting, Martingale, Fibonacci, PositiveStableFibonacci, HiLoCounting)}
+
+# Cached results are only valid for the engine code that produced them
+ENGINE_SOURCES = ('simulator.py', 'runner.py')
+
+def simulator_version():
+    digest = hashlib.sha256()
+    for name in ENGINE_SOURCES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+SIMULATOR_VERSION = simulator_version()
+
+# ==========================================
+# 1. Job Specs
+# ==========================================
+def _number(value):
+    """1.0 and 1 describe the same config; keep one spelling so they hash alike."""
+    if isinstance(value, float) and value.is_integer(): return int(value)
+    return value
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _arguments(cls, values, what, exclude=()):
+    """
+    values checked against cls's constructor: no unknown names, every required
+    one present, true/false where the default is a bool and a number anywhere
+    else (or null, where the default is None).
+    """
+    if not isinstance(values, dict):
+        raise ValueError(f"{what} must be a JSON object")
+    accepted = {name: p for name, p in inspect.signature(cls).parameters.items() if name not in exclude}
+    unknown = sorted(set(values) - set(accepted))
+    if unknown:
+        raise ValueError(f"Unknown {what} {unknown} for {cls.__name__}, expected some of {sorted(accepted)}")
+    for name, p in accepted.items():
+        if name not in values:
+            if p.default is p.empty:
+                raise ValueError(f"{cls.__name__} needs {what} {name!r}")
+            continue
+        value = values[name]
+        if isinstance(p.default, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"{what} {name!r} must be true or false")
+        elif not (_is_number(value) or (value is None and p.default is None)):
+            raise ValueError(f"{what} {name!r} must be a number")
+    return {k: _number(v) for k, v in sorted(values.items())}
+
+def _integer(spec, name, default, minimum=None):
+    value = spec.get(name, default)
+    if not _is_number(value) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"{name} must be a whole number")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return int(value)
+
+def parse_spec(spec):
+    """(TrialConfig, trials, seed) of a JSON job spec. Raises ValueError on a malformed spec."""
+    if not isinstance(spec, dict):
+        raise ValueError("Job spec must be a JSON object")
+    game = spec.get('game')
+    if game not in GAMES:
+        raise ValueError(f"Unknown game {game!r}, expected one of {sorted(GAMES)}")
+    strategy_cls = STRATEGIES.get(spec.get('strategy'))
+    if strategy_cls is None:
+        raise ValueError(f"Unknown strategy {spec.get('strategy')!r}, expected one of {sorted(STRATEGIES)}")
+    # shoe_ref is filled in by make_game, and a BetRamp has no JSON spelling
+    params = _arguments(strategy_cls, spec.get('params', {}), 'params', exclude=('shoe_ref', 'ramp'))
+    stop = spec.get('stop')
+    stop = StopConditions(**_arguments(StopConditions, stop, 'stop')) if stop else None
+    penetration = spec.get('penetration', 0.75)
+    if not _is_number(penetration) or not 0 < penetration <= 1:
+        raise ValueError("penetration must be a number in (0, 1]")
+    config = TrialConfig(
+        game, strategy_cls, params,
+        rounds=_integer(spec, 'rounds', 1000, 1),
+        num_decks=_integer(spec, 'num_decks', 8 if game == 'baccarat' else 6, 1),
+        penetration=float(penetration),
+        stop=stop,
+    )
+    return config, _integer(spec, 'trials', 1000, 1), _integer(spec, 'seed', 0)
+
+def job_key(config, trials, seed):
+    """Content address of a job: hash of the normalized config, trial count, seed and engine version."""
+    normalized = {'config': config_key(config), 'trials': trials, 'seed': seed, 'version': SIMULATOR_VERSION}
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+class Job:
+    def __init__(self, key, config, trials, seed):
+        self.key = key
+        self.config = config
+        self.trials = trials
+        self.seed = seed
+        self.status = 'queued' # queued -> running -> done | failed
+        self.finished_trials = 0
+        self.result = None
+        self.error = None
+        self.changed = threading.Condition()
+
+    @property
+    def over(self):
+        return self.status in ('done', 'failed')
+
+    def update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.changed.notify_all()
+
+    def as_dict(self):
+        data = {'id': self.key, 'status': self.status, 'finished_trials': self.finished_trials,
+                'trials': self.trials, 'config': config_key(self.config), 'seed': self.seed}
+        if self.result is not None: data['result'] = self.result
+        if self.error is not None: data['error'] = self.error
+        return data
+
+# ==========================================
+# 2. Server and Worker Pool
+# ==========================================
+class JobServer(ThreadingHTTPServer):
+    """
+    HTTP front end for run_monte_carlo. At most `max_jobs` jobs run at once,
+    each on `workers` processes, and at most `max_queued` wait behind them.
+    Finished results go to cache_dir/<key>.json; the trials of a job that was
+    interrupted stay in cache_dir/partial/<key> and the next run of the same
+    job picks them up.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, cache_dir='sim_cache', max_jobs=1, workers=None, max_queued=16):
+        super().__init__(address, JobHandler)
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_queued)
+        os.makedirs(os.path.join(cache_dir, 'partial'), exist_ok=True)
+        for _ in range(max_jobs):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def cached(self, key):
+        try:
+            with open(self.cache_path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def submit(self, spec):
+        """(job dict, HTTP status) for a spec: a cached result, the same job already known, or a new one."""
+        config, trials, seed = parse_spec(spec)
+        key = job_key(config, trials, seed)
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and job.status != 'failed':
+                return job.as_dict(), 200
+            entry = self.cached(key)
+            if entry is not None:
+                return dict(entry, cached=True), 200
+            job = Job(key, config, trials, seed)
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                return {'error': "Job queue is full, try again later"}, 503
+            self.jobs[key] = job
+        return job.as_dict(), 202
+
+    def lookup(self, key):
+        with self.lock:
+            job = self.jobs.get(key)
+        if job is not None: return job.as_dict()
+        entry = self.cached(key)
+        return dict(entry, cached=True) if entry is not None else None
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            job.update(status='running')
+            partial = os.path.join(self.cache_dir, 'partial', job.key)
+            try:
+                result = run_monte_carlo(job.config, job.trials, job.seed, workers=self.workers,
+                                         checkpoint_dir=partial,
+                                         progress=lambda finished, _: job.update(finished_trials=finished))
+                # Round-trip through JSON so the live job shows exactly what the cache will serve
+                result = json.loads(json.dumps(result))
+                entry = dict(job.as_dict(), status='done', result=result)
+                tmp = self.cache_path(job.key) + '.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(entry, f, indent=2)
+                os.replace(tmp, self.cache_path(job.key))
+                shutil.rmtree(partial, ignore_errors=True)
+                job.update(status='done', result=result)
+            except Exception as e:
+                job.update(status='failed', error=f"{type(e).__name__}: {e}")
+
+class JobHandler(BaseHTTPRequestHandler):
+    # POST /jobs           submit a spec, returns the job (200 if known or cached, 202 if queued)
+    # GET  /jobs           all jobs of this server run
+    # GET  /jobs/<id>      one job, live or from the cache
+    # GET  /jobs/<id>/events  newline-delimited JSON, one line per progress change until the job ends
+    # GET  /health         engine version
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            return self._send(404, {'error': "Not found"})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length) or b'null')
+            data, status = self.server.submit(spec)
+        except (json.JSONDecodeError, ValueError) as e:
+            return self._send(400, {'error': str(e)})
+        self._send(status, data)
+
+    def do_GET(self):
+        parts = [p for p in self.path.split('?')[0].split('/') if p]
+        if parts == ['health']:
+            return self._send(200, {'status': 'ok', 'version': SIMULATOR_VERSION})
+        if parts == ['jobs']:
+            with self.server.lock:
+                jobs = [job.as_dict() for job in self.server.jobs.values()]
+            return self._send(200, jobs)
+        if len(parts) == 2 and parts[0] == 'jobs':
+            data = self.server.lookup(parts[1])
+            return self._send(200, data) if data else self._send(404, {'error': "Unknown job"})
+        if len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            return self._stream(parts[1])
+        self._send(404, {'error': "Not found"})
+
+    def _stream(self, key):
+        with self.server.lock:
+            job = self.server.jobs.get(key)
+        if job is None:
+            data = self.server.lookup(key)
+            return self._send(200, data) if data else self._send(404, {'error': "Unknown job"})
+
+        # No Content-Length: the response ends when the connection closes after the last event
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        last = None
+        while True:
+            with job.changed:
+                state = (job.status, job.finished_trials)
+                if state == last:
+                    job.changed.wait(timeout=15)
+                    continue
+                data = job.as_dict()
+            last = state
+            self.wfile.write((json.dumps(data) + "\n").encode())
+            self.wfile.flush()
+            if job.over:
+                return
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON server running simulation jobs with a result cache.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-dir', default='sim_cache')
+    parser.add_argument('--jobs', type=int, default=1, help="jobs running at the same time")
+    parser.add_argument('--workers', type=int, help="processes per job (default: CPU count)")
+    parser.add_argument('--queue', type=int, default=16, help="jobs allowed to wait")
+    args = parser.parse_args()
+
+    server = JobServer((args.host, args.port), args.cache_dir, args.jobs, args.workers, args.queue)
+    print(f"Serving on http://{args.host}:{args.port} (engine {SIMULATOR_VERSION}, cache {args.cache_dir})")
+    print(f"""Try: curl -s -X POST localhost:{args.port}/jobs -d '{{"game": "baccarat", "strategy": "Martingale", """
+          f""""params": {{"bankroll": 5000, "base_unit": 10}}, "rounds": 1000, "trials": 2000, "seed": 42}}'""")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,8 +1,18 @@
+import math
 import random
+from array import array
+from collections import namedtuple
 
 # ==========================================
 # 1. Deck & Card Architecture
 # ==========================================
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A')
+SUITS = ('C', 'D', 'H', 'S')
+
+# Per-game card values indexed by rank index (position in RANKS)
+BACCARAT_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 0, 0, 0, 0, 1)
+BLACKJACK_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11)
+
 class Card:
     def __init__(self, rank, suit):
         self.rank = rank # '2'-'9', 'T', 'J', 'Q', 'K', 'A'
@@ -22,10 +32,32 @@ class Card:
     def __repr__(self):
         return f"{self.rank}{self.suit}"
 
+class RankCard:
+    """Suitless card shared by every copy of its rank (see RANK_CARDS)."""
+    __slots__ = ('rank', 'index', 'baccarat_value', 'blackjack_value')
+
+    def __init__(self, index):
+        self.rank = RANKS[index]
+        self.index = index
+        self.baccarat_value = BACCARAT_VALUES[index]
+        self.blackjack_value = BLACKJACK_VALUES[index]
+
+    def get_value(self, game_type="blackjack"):
+        if game_type == "baccarat": return self.baccarat_value
+        return self.blackjack_value
+
+    def __repr__(self):
+        return self.rank
+
+# The only 13 card objects a CompactShoe ever hands out
+RANK_CARDS = tuple(RankCard(i) for i in range(len(RANKS)))
+
 class Shoe:
-    def __init__(self, num_decks=6, penetration=0.75):
+    def __init__(self, num_decks=6, penetration=0.75, rng=None):
         self.num_decks = num_decks
         self.penetration = penetration
+        self.rng = rng if rng is not None else random # Any object with shuffle(), e.g. random.Random(seed)
+        self.on_shuffle = [] # Callbacks run after every reshuffle (e.g. counting strategies)
         self.cards = []
         self.shuffle()
 
@@ -33,13 +65,87 @@ class Shoe:
         ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
         suits = ['C', 'D', 'H', 'S']
         self.cards = [Card(r, s) for r in ranks for s in suits] * self.num_decks
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
+        for callback in self.on_shuffle:
+            callback()
 
     def draw(self):
         if len(self.cards) < (52 * self.num_decks * (1 - self.penetration)):
             self.shuffle()
         return self.cards.pop()
 
+    def remaining(self):
+        return len(self.cards)
+
+    def rank_counts(self):
+        """Cards left per rank, in RANKS order."""
+        counts = dict.fromkeys(RANKS, 0)
+        for card in self.cards:
+            counts[card.rank] += 1
+        return [counts[r] for r in RANKS]
+
+class CompactShoe:
+    """
+    Drop-in replacement for Shoe. Ranks live as small ints in one preallocated
+    array that is shuffled in place and dealt through a cursor, so reshuffles
+    allocate nothing and draw() returns interned RankCard objects.
+    """
+    def __init__(self, num_decks=6, penetration=0.75, rng=None):
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else random
+        self.ranks = array('b', [i for i in range(len(RANKS)) for _ in SUITS] * num_decks)
+        self.size = len(self.ranks)
+        # Shoe reshuffles once fewer than size * (1 - penetration) cards remain;
+        # precompute that as the first cursor position that triggers it.
+        self.cut = self.size - math.ceil(self.size * (1 - penetration)) + 1
+        self.pos = 0
+        self.on_shuffle = []
+        self.shuffle()
+
+    def shuffle(self):
+        self.rng.shuffle(self.ranks)
+        self.pos = 0
+        for callback in self.on_shuffle:
+            callback()
+
+    def draw_index(self):
+        """Same as draw() but returns the rank index instead of a card."""
+        if self.pos >= self.cut:
+            self.shuffle()
+        rank = self.ranks[self.pos]
+        self.pos += 1
+        return rank
+
+    def draw(self):
+        return RANK_CARDS[self.draw_index()]
+
+    def remaining(self):
+        return self.size - self.pos
+
+    def rank_counts(self):
+        rest = self.ranks[self.pos:].tobytes() # bytes.count is a C scan
+        return [rest.count(i) for i in range(len(RANKS))]
+
+class ReplayShoe(CompactShoe):
+    """
+    CompactShoe that deals already shuffled shoes from `source` in order
+    instead of shuffling. source needs num_decks, penetration and shoe(index)
+    returning a rank array; the arrays are only read, so several ReplayShoes
+    can share one source. first_shoe skips to a later shoe of the source.
+    """
+    def __init__(self, source, first_shoe=0):
+        self.source = source
+        self.shoe_index = first_shoe - 1
+        super().__init__(source.num_decks, source.penetration)
+
+    def shuffle(self):
+        self.shoe_index += 1
+        self.ranks = self.source.shoe(self.shoe_index)
+        self.pos = 0
+        for callback in self.on_shuffle:
+            callback()
+
 # ==========================================
 # 2. Betting Strategies
 # ==========================================
@@ -54,6 +160,11 @@ class BettingStrategy:
         """Hook for card counting strategies to track dealt cards."""
         pass 
 
+    def observe_cards(self, cards):
+        """Same as observe_card for several cards dealt at once."""
+        for card in cards:
+            self.observe_card(card)
+
     def update_after_result(self, net_win):
         self.bankroll += net_win
         self.profit += net_win
@@ -67,6 +178,31 @@ class BettingStrategy:
         # Prevent betting more than the bankroll (optional realism)
         return min(self.current_bet, self.bankroll) if self.bankroll > 0 else 0
 
+    # State-machine view of the bet progression, used by markov.py.
+    # The state holds everything _adjust_bet reads or writes.
+    def progression_state(self):
+        return self.current_bet
+
+    def set_progression_state(self, state):
+        self.current_bet = state
+
+    def transition(self, state, net_win):
+        """Progression state after a round with `net_win` played from `state`. Leaves the strategy unchanged."""
+        saved = self.progression_state()
+        self.set_progression_state(state)
+        self._adjust_bet(net_win)
+        new_state = self.progression_state()
+        self.set_progression_state(saved)
+        return new_state
+
+    def bet_in_state(self, state):
+        """Bet asked for in `state`, before get_bet caps it at the bankroll."""
+        saved = self.progression_state()
+        self.set_progression_state(state)
+        bet = self.current_bet
+        self.set_progression_state(saved)
+        return bet
+
 class FlatBetting(BettingStrategy):
     # Bet size never changes
     pass
@@ -100,6 +236,13 @@ class Fibonacci(BettingStrategy):
             
         self.current_bet = self.base_unit * self.sequence[self.index]
     
+    def progression_state(self):
+        return self.index
+
+    def set_progression_state(self, state):
+        self.index = state
+        self.current_bet = self.base_unit * self.sequence[state]
+
     def _lose_bet(self):
         self.index = min(self.index + 1, len(self.sequence) - 1)
     def _win_bet(self):
@@ -113,49 +256,175 @@ class PositiveStableFibonacci(Fibonacci):
         self.index = 0
     
 
-class HiLoCounting(BettingStrategy):
-    def __init__(self, bankroll, base_unit=10, shoe_ref=None):
+class CountingSystem:
+    def __init__(self, name, weights, balanced=True, ace_weight=0):
+        self.name = name
+        self.weights = tuple(weights) # Count per rank, RANKS order
+        self.by_rank = dict(zip(RANKS, self.weights))
+        self.balanced = balanced
+        self.ace_weight = ace_weight # Ace-neutral systems: count units per surplus ace in the side count
+
+    def initial_count(self, num_decks):
+        # Unbalanced systems start below zero so the pivot lands on the same count for any deck number
+        if self.balanced: return 0
+        return -sum(self.weights) * len(SUITS) * (num_decks - 1)
+
+#                              2   3   4   5   6   7   8   9   T   J   Q   K   A
+COUNTING_SYSTEMS = {
+    'hilo':   CountingSystem('Hi-Lo',     ( 1,  1,  1,  1,  1,  0,  0,  0, -1, -1, -1, -1, -1)),
+    'ko':     CountingSystem('KO',        ( 1,  1,  1,  1,  1,  1,  0,  0, -1, -1, -1, -1, -1), balanced=False),
+    'hiopt1': CountingSystem('Hi-Opt I',  ( 0,  1,  1,  1,  1,  0,  0,  0, -1, -1, -1, -1,  0), ace_weight=1),
+    'hiopt2': CountingSystem('Hi-Opt II', ( 1,  1,  2,  2,  1,  1,  0,  0, -2, -2, -2, -2,  0), ace_weight=2),
+    'omega2': CountingSystem('Omega II',  ( 1,  1,  2,  2,  2,  1,  0, -1, -2, -2, -2, -2,  0), ace_weight=2),
+    'zen':    CountingSystem('Zen',       ( 1,  1,  2,  2,  2,  1,  0,  0, -2, -2, -2, -2, -1)),
+}
+
+class BetRamp:
+    """Bet in units by count. steps is [(count, units), ...]; counts below the first step bet min_units."""
+    def __init__(self, steps, min_units=1):
+        self.steps = sorted(steps)
+        self.min_units = min_units
+        self.low = self.steps[0][0]
+        self.high = self.steps[-1][0]
+        # Precomputed units for every integer count between the first and last step
+        by_count = dict(self.steps)
+        self.table = []
+        units = min_units
+        for count in range(self.low, self.high + 1):
+            units = by_count.get(count, units)
+            self.table.append(units)
+
+    def units(self, count):
+        if count < self.low: return self.min_units
+        if count > self.high: return self.table[-1]
+        return self.table[count - self.low]
+
+    @classmethod
+    def linear(cls, max_count=20):
+        # One extra unit per count above zero
+        return cls([(count, 1 + count) for count in range(1, max_count + 1)])
+
+class CountingStrategy(BettingStrategy):
+    def __init__(self, bankroll, base_unit=10, shoe_ref=None, system='hilo', ramp=None):
+        if shoe_ref is None:
+            raise ValueError(f"{type(self).__name__} needs shoe_ref, the shoe whose cards it counts")
         super().__init__(bankroll, base_unit)
+        self.system = COUNTING_SYSTEMS[system] if isinstance(system, str) else system
+        self.ramp = ramp or BetRamp.linear()
+        self.weights = self.system.by_rank
         self.shoe = shoe_ref
-        self.running_count = 0
+        self.num_decks = shoe_ref.num_decks
+        shoe_ref.on_shuffle.append(self.reset)
+        self.reset()
+
+    def reset(self):
+        """Fresh shoe: counts start over."""
+        self.running_count = self.system.initial_count(self.num_decks)
+        self.cards_remaining = 52 * self.num_decks
+        self.aces_remaining = len(SUITS) * self.num_decks
 
     def observe_card(self, card):
-        if card.rank in ['2', '3', '4', '5', '6']:
-            self.running_count += 1
-        elif card.rank in ['T', 'J', 'Q', 'K', 'A']:
-            self.running_count -= 1
+        self.running_count += self.weights[card.rank]
+        self.cards_remaining -= 1
+        if card.rank == 'A': self.aces_remaining -= 1
+
+    def observe_cards(self, cards):
+        weights = self.weights
+        aces = 0
+        for card in cards:
+            self.running_count += weights[card.rank]
+            if card.rank == 'A': aces += 1
+        self.cards_remaining -= len(cards)
+        self.aces_remaining -= aces
+
+    def observe_ranks(self, ranks):
+        """Batch observe by rank index (RANKS order), for engines that deal integers."""
+        weights = self.system.weights
+        self.running_count += sum(weights[r] for r in ranks)
+        self.cards_remaining -= len(ranks)
+        self.aces_remaining -= sum(1 for r in ranks if r == len(RANKS) - 1)
+
+    def decks_remaining(self):
+        return max(1, self.cards_remaining / 52.0)
+
+    def ace_surplus(self):
+        """Aces left minus the share a neutral shoe would have (one per 13 cards)."""
+        return self.aces_remaining - self.cards_remaining / 13.0
+
+    def true_count(self):
+        count = self.running_count
+        if self.system.ace_weight:
+            count += self.system.ace_weight * self.ace_surplus()
+        if not self.system.balanced:
+            return int(count) # Unbalanced systems bet off the running count
+        return int(count / self.decks_remaining())
 
     def _adjust_bet(self, net_win):
-        # Update bet purely based on true count, ignoring last win/loss
-        cards_remaining = len(self.shoe.cards)
-        decks_remaining = max(1, cards_remaining / 52.0)
-        true_count = int(self.running_count / decks_remaining)
+        # Update bet purely based on the count, ignoring last win/loss
+        self.current_bet = self.base_unit * self.ramp.units(self.true_count())
 
-        if true_count <= 0:
-            self.current_bet = self.base_unit
-        else:
-            # Bet spread: Increase by 1 unit per True Count
-            self.current_bet = self.base_unit + (true_count * self.base_unit)
+class HiLoCounting(CountingStrategy):
+    def __init__(self, bankroll, base_unit=10, shoe_ref=None, ramp=None):
+        super().__init__(bankroll, base_unit, shoe_ref, 'hilo', ramp)
 
 # ==========================================
 # 3. Game Engines
 # ==========================================
-class BaccaratSimulator:
+def banker_draws(b_score, p_third_val):
+    """Baccarat banker third card rule. p_third_val is None when the player stood."""
+    if p_third_val is None: return b_score <= 5
+    if b_score <= 2: return True
+    if b_score == 3: return p_third_val != 8
+    if b_score == 4: return p_third_val in (2, 3, 4, 5, 6, 7)
+    if b_score == 5: return p_third_val in (4, 5, 6, 7)
+    if b_score == 6: return p_third_val in (6, 7)
+    return False
+
+# One settled round, as sent to observers
+RoundEvent = namedtuple('RoundEvent', ['bet', 'outcome', 'net', 'bankroll', 'seat'], defaults=(0,))
+
+class GameSimulator:
     def __init__(self, strategy: BettingStrategy, shoe: Shoe):
         self.shoe = shoe
-        self.strategy = strategy
-
-    def baccarat_score(self, hand):
-        return sum(card.get_value("baccarat") for card in hand) % 10
+        # A list of strategies seats several players at the table; they share the shoe and
+        # the dealer's hand and all of them see every card. self.strategy is the first seat.
+        self.seats = list(strategy) if isinstance(strategy, (list, tuple)) else [strategy]
+        self.strategy = self.seats[0]
+        self.observers = [] # Callables receiving a RoundEvent after every settled round (and seat)
 
     def draw_and_observe(self):
         card = self.shoe.draw()
-        self.strategy.observe_card(card)
+        for seat in self.seats:
+            seat.observe_card(card)
         return card
 
+    def settle(self, bet, outcome, net_win, seat=None):
+        strategy = seat or self.strategy
+        strategy.update_after_result(net_win)
+        if self.observers:
+            event = RoundEvent(bet, outcome, net_win, strategy.bankroll, self.seats.index(strategy))
+            for observer in self.observers:
+                observer(event)
+
+    def stream(self, rounds):
+        """Plays up to `rounds` rounds, yielding each RoundEvent as it happens."""
+        events = []
+        self.observers.append(events.append)
+        try:
+            for _ in range(rounds):
+                self.play_round()
+                yield from events
+                events.clear()
+        finally:
+            self.observers.remove(events.append)
+
+class BaccaratSimulator(GameSimulator):
+    def baccarat_score(self, hand):
+        return sum(card.get_value("baccarat") for card in hand) % 10
+
     def play_round(self):
-        bet_amount = self.strategy.get_bet()
-        if bet_amount <= 0: return # Bankrupt
+        bets = [seat.get_bet() for seat in self.seats]
+        if max(bets) <= 0: return # Bankrupt
         
         # Always bet Banker for lowest house edge
         bet_choice = 'Banker' 
@@ -176,35 +445,96 @@ class BaccaratSimulator:
             else:
                 p_third_val = None
             
-            if p_third_val is None:
-                if b_score <= 5: banker_hand.append(self.draw_and_observe())
-            else:
-                if b_score <= 2: banker_hand.append(self.draw_and_observe())
-                elif b_score == 3 and p_third_val != 8: banker_hand.append(self.draw_and_observe())
-                elif b_score == 4 and p_third_val in (2,3,4,5,6,7): banker_hand.append(self.draw_and_observe())
-                elif b_score == 5 and p_third_val in (4,5,6,7): banker_hand.append(self.draw_and_observe())
-                elif b_score == 6 and p_third_val in (6,7): banker_hand.append(self.draw_and_observe())
+            if banker_draws(b_score, p_third_val):
+                banker_hand.append(self.draw_and_observe())
             
             b_score = self.baccarat_score(banker_hand)
 
-        # Resolution
-        win_amount = -bet_amount
-        if p_score > b_score:
-            if bet_choice == 'Player': win_amount = bet_amount
-        elif b_score > p_score:
-            if bet_choice == 'Banker': win_amount = bet_amount * 0.95 # 5% commission
-        else:
-            if bet_choice == 'Tie': win_amount = bet_amount * 8
-            else: win_amount = 0 # Push
+        # Resolution, seat by seat; a bankrupt seat sits the coup out
+        for seat, bet_amount in zip(self.seats, bets):
+            if bet_amount <= 0: continue
+            win_amount = -bet_amount
+            if p_score > b_score:
+                outcome = 'Player'
+                if bet_choice == 'Player': win_amount = bet_amount
+            elif b_score > p_score:
+                outcome = 'Banker'
+                if bet_choice == 'Banker': win_amount = bet_amount * 0.95 # 5% commission
+            else:
+                outcome = 'Tie'
+                if bet_choice == 'Tie': win_amount = bet_amount * 8
+                else: win_amount = 0 # Push
 
-        self.strategy.update_after_result(win_amount)
+            self.settle(bet_amount, outcome, win_amount, seat)
 
-class BlackjackSimulator:
-    def __init__(self, strategy: BettingStrategy, shoe: Shoe):
-        self.shoe = shoe
-        self.strategy = strategy
+class BlackjackRules:
+    def __init__(self, num_decks=6, dealer_hits_soft_17=False, double_after_split=True,
+                 surrender=False, max_hands=4, resplit_aces=False, blackjack_pays=1.5):
+        self.num_decks = num_decks
+        self.dealer_hits_soft_17 = dealer_hits_soft_17
+        self.double_after_split = double_after_split
+        self.surrender = surrender # Late surrender, first two cards of an unsplit hand
+        self.max_hands = max_hands # Hands a player may hold after splitting
+        self.resplit_aces = resplit_aces
+        self.blackjack_pays = blackjack_pays
+
+class Hand(list):
+    """Blackjack hand that updates its score as cards are appended instead of rescanning."""
+    __slots__ = ('hard', 'aces', 'bet', 'split', 'done')
+
+    def __init__(self, cards=(), bet=0):
+        super().__init__()
+        self.hard = 0 # Total with every ace counted as 1
+        self.aces = 0
+        self.bet = bet
+        self.split = False # Came from a split
+        self.done = False # Stood, doubled, busted or surrendered
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        super().append(card)
+        value = card.get_value("blackjack")
+        if value == 11:
+            self.aces += 1
+            self.hard += 1
+        else:
+            self.hard += value
+
+    @property
+    def soft(self):
+        return self.aces > 0 and self.hard + 10 <= 21
+
+    @property
+    def score(self):
+        return self.hard + 10 if self.soft else self.hard
+
+    @property
+    def pair_value(self):
+        """Blackjack value of the pair (10 for any two ten-cards), or None."""
+        if len(self) != 2: return None
+        a, b = self[0].get_value("blackjack"), self[1].get_value("blackjack")
+        return a if a == b else None
+
+    def split_off(self):
+        """Removes the second card and returns it as a new split hand with the same bet."""
+        second = self.pop()
+        first = self.pop()
+        self.hard = self.aces = 0
+        self.append(first)
+        self.split = True
+        other = Hand([second], self.bet)
+        other.split = True
+        return other
+
+class BlackjackSimulator(GameSimulator):
+    def __init__(self, strategy: BettingStrategy, shoe: Shoe, rules: BlackjackRules = None):
+        super().__init__(strategy, shoe)
+        self.rules = rules or BlackjackRules(num_decks=shoe.num_decks)
+        self.hands = [] # Player hands of the round in progress
 
     def bj_score(self, hand):
+        if isinstance(hand, Hand): return hand.score
         score = sum(card.get_value("blackjack") for card in hand)
         aces = sum(1 for card in hand if card.rank == 'A')
         while score > 21 and aces > 0:
@@ -212,14 +542,19 @@ class BlackjackSimulator:
             aces -= 1
         return score
 
-    def draw_and_observe(self):
-        card = self.shoe.draw()
-        self.strategy.observe_card(card)
-        return card
+    def can_double(self, hand):
+        return len(hand) == 2 and (not hand.split or self.rules.double_after_split)
+
+    def can_split(self, hand):
+        if hand.pair_value is None or len(self.hands) >= self.rules.max_hands: return False
+        return not (hand.split and hand.pair_value == 11 and not self.rules.resplit_aces)
+
+    def can_surrender(self, hand):
+        return self.rules.surrender and len(hand) == 2 and not hand.split
 
     def get_action(self, player_hand, dealer_upcard):
         # Simplified Basic Strategy
-        score = self.bj_score(player_hand)
+        score = player_hand.score
         d_val = dealer_upcard.get_value("blackjack")
         
         if score < 12: return 'H'
@@ -228,72 +563,146 @@ class BlackjackSimulator:
         if d_val > 6: return 'H'
         return 'S'
 
-    def play_round(self):
-        bet_amount = self.strategy.get_bet()
-        if bet_amount <= 0: return # Bankrupt
-        
-        player_hand = [self.draw_and_observe(), self.draw_and_observe()]
-        dealer_hand = [self.draw_and_observe(), self.draw_and_observe()]
-        dealer_upcard = dealer_hand[0]
-
-        p_score = self.bj_score(player_hand)
-        d_score = self.bj_score(dealer_hand)
-
-        # Blackjack Check
-        if p_score == 21 and d_score != 21:
-            self.strategy.update_after_result(bet_amount * 1.5)
-            return
-        elif p_score == 21 and d_score == 21:
-            self.strategy.update_after_result(0)
-            return
-        elif d_score == 21:
-            self.strategy.update_after_result(-bet_amount)
-            return
-
-        # Player Turn
-        multiplier = 1
-        while True:
-            action = self.get_action(player_hand, dealer_upcard)
-            if action == 'H':
-                player_hand.append(self.draw_and_observe())
-                if self.bj_score(player_hand) > 21:
-                    self.strategy.update_after_result(-bet_amount)
+    def play_hand(self, hand, dealer_upcard):
+        while not hand.done:
+            if len(hand) == 1:
+                hand.append(self.draw_and_observe()) # Second card of a split hand
+                if hand[0].rank == 'A':
+                    # Split aces get one card each, unless they can be split again
+                    if self.can_split(hand) and self.get_action(hand, dealer_upcard) == 'P':
+                        self.hands.append(hand.split_off())
+                        continue
+                    hand.done = True
                     return
-            elif action == 'D':
-                multiplier = 2
-                player_hand.append(self.draw_and_observe())
-                break # Forced stand
+            if hand.score >= 21:
+                hand.done = True
+                return
+
+            action = self.get_action(hand, dealer_upcard)
+            if action == 'P' and self.can_split(hand):
+                self.hands.append(hand.split_off())
+            elif action == 'R' and self.can_surrender(hand):
+                hand.bet /= 2
+                hand.done = True
+                return 'R'
+            elif action == 'D' and self.can_double(hand):
+                hand.bet *= 2
+                hand.append(self.draw_and_observe())
+                hand.done = True # Forced stand
+            elif action in ('H', 'D', 'P', 'R'): # Anything not allowed becomes a hit
+                hand.append(self.draw_and_observe())
             else: # Stand
-                break
+                hand.done = True
+
+    def play_round(self):
+        seated = [(seat, bet) for seat in self.seats for bet in (seat.get_bet(),) if bet > 0]
+        if not seated: return # Bankrupt
 
-        p_score = self.bj_score(player_hand)
-        if p_score > 21:
-            self.strategy.update_after_result(-bet_amount * multiplier)
+        # Each seat gets two cards in seat order, then the dealer
+        player_hands = [Hand([self.draw_and_observe(), self.draw_and_observe()], bet) for _, bet in seated]
+        dealer_hand = Hand([self.draw_and_observe(), self.draw_and_observe()])
+        dealer_upcard = dealer_hand[0]
+        d_score = dealer_hand.score
+
+        waiting = [] # Seats with hands left for the dealer to beat
+        for (seat, bet_amount), player_hand in zip(seated, player_hands):
+            p_score = player_hand.score
+
+            # Blackjack Check
+            if p_score == 21 and d_score != 21:
+                self.settle(bet_amount, 'blackjack', bet_amount * self.rules.blackjack_pays, seat)
+                continue
+            elif p_score == 21 and d_score == 21:
+                self.settle(bet_amount, 'push', 0, seat)
+                continue
+            elif d_score == 21:
+                self.settle(bet_amount, 'dealer_blackjack', -bet_amount, seat)
+                continue
+
+            # Player Turn (splits append new hands while we go)
+            self.hands = [player_hand]
+            net_win = 0
+            live = []
+            i = 0
+            while i < len(self.hands):
+                hand = self.hands[i]
+                if self.play_hand(hand, dealer_upcard) == 'R' or hand.score > 21:
+                    net_win -= hand.bet
+                else:
+                    live.append(hand)
+                i += 1
+
+            if not live:
+                self.settle(bet_amount, 'loss', net_win, seat)
+                continue
+            waiting.append((seat, bet_amount, net_win, live))
+
+        if not waiting:
             return
 
-        # Dealer Turn (Hits soft 17)
-        while self.bj_score(dealer_hand) < 17:
+        # Dealer Turn (stands on soft 17 unless the rules say otherwise)
+        while dealer_hand.score < 17 or (dealer_hand.score == 17 and dealer_hand.soft and self.rules.dealer_hits_soft_17):
             dealer_hand.append(self.draw_and_observe())
             
-        d_score = self.bj_score(dealer_hand)
-        net_bet = bet_amount * multiplier
-
-        if d_score > 21 or p_score > d_score:
-            self.strategy.update_after_result(net_bet)
-        elif d_score > p_score:
-            self.strategy.update_after_result(-net_bet)
-        else:
-            self.strategy.update_after_result(0)
-
-def simulate(strat, r=100):
+        d_score = dealer_hand.score
+        for seat, bet_amount, net_win, live in waiting:
+            for hand in live:
+                p_score = hand.score
+                if d_score > 21 or p_score > d_score:
+                    net_win += hand.bet
+                elif d_score > p_score:
+                    net_win -= hand.bet
+
+            outcome = 'win' if net_win > 0 else 'loss' if net_win < 0 else 'push'
+            self.settle(bet_amount, outcome, net_win, seat)
+
+class StopConditions:
+    """When a run should end early. Limits are in money; None disables a check."""
+    def __init__(self, ruin=True, win_goal=None, stop_loss=None, max_drawdown=None):
+        self.ruin = ruin
+        self.win_goal = win_goal # Stop once profit reaches this
+        self.stop_loss = stop_loss # Stop once the loss reaches this (positive number)
+        self.max_drawdown = max_drawdown # Stop once bankroll falls this far below its peak
+
+    def check(self, strategy, peak):
+        """Name of the first condition that is met, or None to keep playing."""
+        if self.ruin and strategy.get_bet() <= 0: return 'ruin'
+        if self.win_goal is not None and strategy.profit >= self.win_goal: return 'win_goal'
+        if self.stop_loss is not None and strategy.profit <= -self.stop_loss: return 'stop_loss'
+        if self.max_drawdown is not None and peak - strategy.bankroll >= self.max_drawdown: return 'max_drawdown'
+        return None
+
+def run_rounds(game, rounds, stop=None, every_seat=True):
+    """
+    Plays up to `rounds` rounds. Returns (rounds played, name of the stop condition or None).
+    At a multi-seat table the run goes on until every seat has met a condition,
+    or only the first seat with every_seat=False, and the reason returned is the
+    first seat's. play_round deals in every seat that can still bet, so a seat
+    that stopped on anything but ruin keeps playing while the others do.
+    """
+    stop = stop or StopConditions()
+    seats = game.seats if every_seat else [game.strategy]
+    peaks = [seat.bankroll for seat in seats]
+    reasons = [stop.check(seat, peak) for seat, peak in zip(seats, peaks)]
+    played = 0
+    while None in reasons and played < rounds:
+        game.play_round()
+        played += 1
+        for i, seat in enumerate(seats):
+            if reasons[i] is not None: continue
+            peaks[i] = max(peaks[i], seat.bankroll)
+            reasons[i] = stop.check(seat, peaks[i])
+    return played, reasons[0]
+
+def simulate(strat, r=100, shoe_cls=Shoe, stop=None):
     # 1. Test Baccarat with Negative Fibonacci
-    bac_shoe = Shoe(num_decks=8)
+    bac_shoe = shoe_cls(num_decks=8)
     bac_strat = strat
     bac_game = BaccaratSimulator(bac_strat, bac_shoe)
     
-    for _ in range(r): 
-        bac_game.play_round()
-    print(f"Baccarat ({bac_strat.__class__.__name__}): Bankroll = ${bac_strat.bankroll:.2f} | Profit = ${bac_strat.profit:.2f}")
+    played, reason = run_rounds(bac_game, r, stop)
+    stopped = f" | Stopped after {played} hands ({reason})" if reason else ""
+    print(f"Baccarat ({bac_strat.__class__.__name__}): Bankroll = ${bac_strat.bankroll:.2f} | Profit = ${bac_strat.profit:.2f}{stopped}")
 
 # ==========================================
 # 4. Running the Tests
@@ -312,8 +721,7 @@ if __name__ == "__main__":
     bac_strat = PositiveStableFibonacci(STARTING_BANKROLL, BASE_UNIT, is_positive=True)
     bac_game = BaccaratSimulator(bac_strat, bac_shoe)
     
-    for _ in range(ROUNDS): 
-        bac_game.play_round()
+    run_rounds(bac_game, ROUNDS)
     print(f"Baccarat (Fibonacci): Bankroll = ${bac_strat.bankroll:.2f} | Profit = ${bac_strat.profit:.2f}")
 
     # 2. Test Blackjack with Hi-Lo Card Counting
@@ -321,6 +729,14 @@ if __name__ == "__main__":
     bj_strat = HiLoCounting(STARTING_BANKROLL, BASE_UNIT, shoe_ref=bj_shoe)
     bj_game = BlackjackSimulator(bj_strat, bj_shoe)
     
-    for _ in range(ROUNDS): 
-        bj_game.play_round()
-    print(f"Blackjack (Hi-Lo Counting): Bankroll = ${bj_strat.bankroll:.2f} | Profit = ${bj_strat.profit:.2f}")
\ No newline at end of file
+    run_rounds(bj_game, ROUNDS)
+    print(f"Blackjack (Hi-Lo Counting): Bankroll = ${bj_strat.bankroll:.2f} | Profit = ${bj_strat.profit:.2f}")
+    # 3. Full Blackjack table: a counter and two flat bettors sharing one shoe
+    table_shoe = Shoe(num_decks=6)
+    seats = [HiLoCounting(STARTING_BANKROLL, BASE_UNIT, shoe_ref=table_shoe),
+             FlatBetting(STARTING_BANKROLL, BASE_UNIT), FlatBetting(STARTING_BANKROLL, BASE_UNIT)]
+    table = BlackjackSimulator(seats, table_shoe)
+
+    run_rounds(table, ROUNDS)
+    for i, seat in enumerate(seats):
+        print(f"Blackjack table seat {i + 1} ({seat.__class__.__name__}): Bankroll = ${seat.bankroll:.2f} | Profit = ${seat.profit:.2f}")
@@ -0,0 +1,213 @@
+import math
+import time
+
+from simulator import BaccaratSimulator, CompactShoe, FlatBetting, Martingale
+
+# ==========================================
+# 1. Online Aggregators
+# ==========================================
+# Each aggregator is an observer: call it with a RoundEvent, memory stays constant.
+# They follow one bankroll, so at a multi-seat table use OnlineStats(seat=...) or TableStats.
+class Welford:
+    """Running mean and variance of the net result per round."""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def __call__(self, event):
+        self.count += 1
+        delta = event.net - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (event.net - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+class MaxDrawdown:
+    """Largest fall of the bankroll from a previous peak."""
+    def __init__(self, starting_bankroll):
+        self.peak = starting_bankroll
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+
+    def __call__(self, event):
+        if event.bankroll > self.peak:
+            self.peak = event.bankroll
+            return
+        drawdown = self.peak - event.bankroll
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+            self.max_drawdown_pct = drawdown / self.peak if self.peak > 0 else 0.0
+
+class LosingStreak:
+    """Longest run of losing rounds. A push neither extends nor breaks a streak."""
+    def __init__(self):
+        self.current = 0
+        self.longest = 0
+
+    def __call__(self, event):
+        if event.net < 0:
+            self.current += 1
+            self.longest = max(self.longest, self.current)
+        elif event.net > 0:
+            self.current = 0
+
+class TimeToRuin:
+    """Number of the round (1-based) after which the bankroll first hit zero, or None."""
+    def __init__(self):
+        self.rounds = 0
+        self.ruined_at = None
+
+    def __call__(self, event):
+        self.rounds += 1
+        if self.ruined_at is None and event.bankroll <= 0:
+            self.ruined_at = self.rounds
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P-square algorithm
+    (Jain & Chlamtac): five markers, no stored samples.
+    """
+    def __init__(self, p):
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the middle markers toward their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    @property
+    def value(self):
+        q = self.heights
+        if not q: return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(self.p * len(q)))]
+        return q[2]
+
+class BankrollQuantiles:
+    def __init__(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        self.sketches = [P2Quantile(p) for p in quantiles]
+
+    def __call__(self, event):
+        for sketch in self.sketches:
+            sketch.add(event.bankroll)
+
+    def values(self):
+        return {sketch.p: sketch.value for sketch in self.sketches}
+
+# ==========================================
+# 2. Everything at Once
+# ==========================================
+class OnlineStats:
+    """Attach to game.observers to collect every aggregator in one pass, for the events of one seat."""
+    def __init__(self, starting_bankroll, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), seat=0):
+        self.seat = seat
+        self.net = Welford()
+        self.drawdown = MaxDrawdown(starting_bankroll)
+        self.streak = LosingStreak()
+        self.ruin = TimeToRuin()
+        self.bankroll = BankrollQuantiles(quantiles)
+        self.aggregators = (self.net, self.drawdown, self.streak, self.ruin, self.bankroll)
+
+    def __call__(self, event):
+        if event.seat != self.seat: return
+        for aggregator in self.aggregators:
+            aggregator(event)
+
+    def summary(self):
+        return {
+            'rounds': self.net.count,
+            'mean_net': self.net.mean,
+            'stdev_net': self.net.stdev,
+            'max_drawdown': self.drawdown.max_drawdown,
+            'max_drawdown_pct': self.drawdown.max_drawdown_pct,
+            'longest_losing_streak': self.streak.longest,
+            'ruined_at': self.ruin.ruined_at,
+            'bankroll_quantiles': self.bankroll.values(),
+        }
+
+class TableStats:
+    """One OnlineStats per seat of a multi-seat table."""
+    def __init__(self, starting_bankrolls, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        self.seats = [OnlineStats(bankroll, quantiles, seat) for seat, bankroll in enumerate(starting_bankrolls)]
+
+    def __call__(self, event):
+        self.seats[event.seat](event)
+
+    def summary(self):
+        return [stats.summary() for stats in self.seats]
+
+if __name__ == "__main__":
+    ROUNDS = 100000
+    STARTING_BANKROLL = 5000
+    BASE_UNIT = 10
+
+    strat = Martingale(STARTING_BANKROLL, BASE_UNIT)
+    game = BaccaratSimulator(strat, CompactShoe(num_decks=8))
+    stats = OnlineStats(STARTING_BANKROLL)
+    game.observers.append(stats)
+    for _ in range(ROUNDS):
+        game.play_round()
+    print(f"--- Baccarat (Martingale), {ROUNDS} hands ---")
+    for key, value in stats.summary().items():
+        print(f"{key}: {value}")
+
+    # Same thing as a generator
+    game = BaccaratSimulator(FlatBetting(STARTING_BANKROLL, BASE_UNIT), CompactShoe(num_decks=8))
+    worst = min(event.bankroll for event in game.stream(ROUNDS))
+    print(f"Flat betting lowest bankroll: ${worst:.2f}")
+
+    # Overhead of the event hook when nothing listens
+    for observers in ([], [OnlineStats(10**9)]):
+        game = BaccaratSimulator(FlatBetting(10**9, BASE_UNIT), CompactShoe(num_decks=8))
+        game.observers.extend(observers)
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            game.play_round()
+        print(f"{len(observers)} observers: {ROUNDS / (time.perf_counter() - start):.0f} rounds/s")
@@ -0,0 +1,179 @@
+import csv
+import itertools
+import math
+import os
+import random
+import statistics
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from runner import make_game, trial_seed
+from simulator import RANKS, SUITS, Fibonacci, FlatBetting, Martingale, PositiveStableFibonacci, ReplayShoe, \
+    StopConditions, run_rounds
+
+Z95 = 1.959964 # Two-sided 95% normal quantile
+
+# ==========================================
+# 1. Shared Shoe Sequences
+# ==========================================
+class ShoeSequence:
+    """
+    The shuffled shoes of one trial, dealt lazily from one seed and kept, so
+    every ReplayShoe reading this sequence sees the same cards in the same order.
+    """
+    def __init__(self, num_decks, penetration, seed):
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.rng = random.Random(seed)
+        self.fresh = array('b', [i for i in range(len(RANKS)) for _ in SUITS] * num_decks)
+        self.shoes = []
+
+    def shoe(self, index):
+        while len(self.shoes) <= index:
+            ranks = array('b', self.fresh)
+            self.rng.shuffle(ranks)
+            self.shoes.append(ranks)
+        return self.shoes[index]
+
+# ==========================================
+# 2. Grid
+# ==========================================
+def expand_grid(strategies, params_grid, shoe_grid):
+    """
+    Strategy configs and shoe configs of a sweep. `strategies` holds classes or
+    (class, fixed params) pairs, params_grid and shoe_grid map a name to the
+    values to try; every combination is one config.
+    """
+    def product(grid):
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+    strategy_configs = []
+    for entry in strategies:
+        cls, fixed = entry if isinstance(entry, tuple) else (entry, {})
+        for params in product(params_grid):
+            strategy_configs.append((cls, {**params, **fixed}))
+    return strategy_configs, product(shoe_grid)
+
+def _run_chunk(game, strategy_configs, shoe, rounds, stop, master_seed, trials):
+    """Plays every strategy config on the same recorded shoes, trial by trial."""
+    results = {}
+    for t in trials:
+        sequence = ShoeSequence(shoe['num_decks'], shoe['penetration'], trial_seed(master_seed, t))
+        row = []
+        for cls, params in strategy_configs:
+            g = make_game(game, cls, params, ReplayShoe(sequence))
+            played, reason = run_rounds(g, rounds, stop)
+            row.append((g.strategy.profit, g.strategy.bankroll, played, reason))
+        results[t] = row
+    return results
+
+# ==========================================
+# 3. Confidence Intervals
+# ==========================================
+def mean_ci(values):
+    """(mean, stdev, half width of the 95% normal confidence interval)."""
+    mean = statistics.fmean(values)
+    stdev = statistics.stdev(values) if len(values) > 1 else 0.0
+    return mean, stdev, Z95 * stdev / math.sqrt(len(values))
+
+def proportion_ci(hits, n):
+    """Wilson score interval of a proportion, as (low, high)."""
+    p = hits / n
+    denom = 1 + Z95 ** 2 / n
+    centre = (p + Z95 ** 2 / (2 * n)) / denom
+    half = Z95 * math.sqrt(p * (1 - p) / n + Z95 ** 2 / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def _rows(game, strategy_configs, shoe, results):
+    """One tidy row per strategy config. Differences are paired against the first config of the grid."""
+    rows = []
+    reference = [res[0][0] for res in results]
+    for i, (cls, params) in enumerate(strategy_configs):
+        trial_results = [res[i] for res in results]
+        profits = [r[0] for r in trial_results]
+        mean, stdev, half = mean_ci(profits)
+        ruined = sum(1 for r in trial_results if r[1] <= 0)
+        ruin_low, ruin_high = proportion_ci(ruined, len(results))
+        diff, diff_stdev, diff_half = mean_ci([p - ref for p, ref in zip(profits, reference)])
+        rows.append({
+            'game': game,
+            'strategy': cls.__name__,
+            **params,
+            **shoe,
+            'trials': len(results),
+            'mean_profit': mean,
+            'stdev_profit': stdev,
+            'ci_low': mean - half,
+            'ci_high': mean + half,
+            'ruin_probability': ruined / len(results),
+            'ruin_ci_low': ruin_low,
+            'ruin_ci_high': ruin_high,
+            'mean_rounds': statistics.fmean(r[2] for r in trial_results),
+            'diff_vs_first': diff,
+            'diff_ci_low': diff - diff_half,
+            'diff_ci_high': diff + diff_half,
+        })
+    return rows
+
+# ==========================================
+# 4. Sweep Runner
+# ==========================================
+def sweep(game, strategies, params_grid, shoe_grid, rounds=1000, trials=1000, seed=0, stop=None, workers=None,
+          chunk_size=None):
+    """
+    Runs every (strategy, params, shoe config) combination for `trials` trials
+    and returns a list of tidy rows, one per combination.
+
+    Common random numbers: within a shoe config, trial t of every strategy
+    config is dealt from the same ShoeSequence, so all of them see the same
+    cards and each sequence is shuffled once instead of once per config.
+    Differences between configs (diff_vs_first) are paired per trial and
+    their intervals are much narrower than those of independent runs.
+    """
+    strategy_configs, shoe_configs = expand_grid(strategies, params_grid, shoe_grid)
+    stop = stop or StopConditions()
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, trials // (workers * 4))
+    chunks = [list(range(start, min(start + chunk_size, trials))) for start in range(0, trials, chunk_size)]
+
+    rows = []
+    for shoe in shoe_configs:
+        args = (game, strategy_configs, shoe, rounds, stop, seed)
+        done = {}
+        if workers == 1:
+            for chunk in chunks:
+                done.update(_run_chunk(*args, chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for f in [pool.submit(_run_chunk, *args, chunk) for chunk in chunks]:
+                    done.update(f.result())
+        rows += _rows(game, strategy_configs, shoe, [done[t] for t in range(trials)])
+    return rows
+
+def write_csv(rows, path):
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def print_table(rows):
+    for row in rows:
+        shoe = f"{row['num_decks']}d/{row['penetration']}"
+        print(f"{row['strategy']:<24} unit ${row['base_unit']:<4} {shoe:<8} "
+              f"mean ${row['mean_profit']:>9.2f} [{row['ci_low']:>9.2f}, {row['ci_high']:>9.2f}] "
+              f"ruin {row['ruin_probability']:>6.1%} | vs first ${row['diff_vs_first']:>9.2f} "
+              f"[{row['diff_ci_low']:>9.2f}, {row['diff_ci_high']:>9.2f}]")
+
+if __name__ == "__main__":
+    rows = sweep(
+        'baccarat',
+        [FlatBetting, Martingale, Fibonacci, PositiveStableFibonacci],
+        {'bankroll': [5000], 'base_unit': [10, 25]},
+        {'num_decks': [6, 8], 'penetration': [0.75]},
+        rounds=1000, trials=500, seed=42,
+    )
+    print_table(rows)
+    write_csv(rows, 'sweep_results.csv')
+    print("Results written to sweep_results.csv")
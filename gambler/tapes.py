@@ -0,0 +1,178 @@
+import gc
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from runner import TrialConfig, make_game, print_summary, summarize
+from simulator import RANKS, SUITS, Martingale, ReplayShoe, StopConditions, run_rounds
+
+# ==========================================
+# 1. Tape Format
+# ==========================================
+# Header: magic, version, decks, penetration, seed, cards per shoe, shoes; little-endian,
+# padded to HEADER_SIZE bytes. Then the shoes back to back, one rank index (0-12) per byte.
+MAGIC = b'GSHOE'
+VERSION = 1
+HEADER = struct.Struct('<5sBHdQIQ')
+HEADER_SIZE = 64
+
+def write_tape(path, num_decks=8, penetration=0.75, shoes=10000, seed=0):
+    """Shuffles `shoes` shoes from one seed and writes them to a tape at path."""
+    rng = random.Random(seed)
+    ranks = array('b', [i for i in range(len(RANKS)) for _ in SUITS] * num_decks)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, num_decks, penetration, seed, len(ranks), shoes).ljust(HEADER_SIZE, b'\0'))
+        for _ in range(shoes):
+            rng.shuffle(ranks)
+            ranks.tofile(f)
+    os.replace(tmp, path)
+
+class ShoeTape:
+    """
+    Read-only, memory-mapped tape. shoe(i) is a zero-copy view into the map,
+    so a ReplayShoe over the tape deals without any RNG work, and processes
+    opening the same file share its pages through the OS page cache.
+    Pickles as its path, so it can be handed to pool workers.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.num_decks, self.penetration, self.seed, self.shoe_size, self.shoes = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a shoe tape")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported tape version {version}")
+        if len(self._map) != HEADER_SIZE + self.shoe_size * self.shoes:
+            raise ValueError(f"{path}: truncated tape")
+        self._view = memoryview(self._map)[HEADER_SIZE:]
+
+    def __len__(self):
+        return self.shoes
+
+    def shoe(self, index):
+        if index >= self.shoes:
+            raise IndexError(f"{self.path} holds only {self.shoes} shoes")
+        start = index * self.shoe_size
+        return self._view[start:start + self.shoe_size]
+
+    def as_array(self):
+        """The whole tape as a (shoes, cards) np.memmap, for the batch engines."""
+        import numpy as np
+        return np.memmap(self.path, dtype=np.int8, mode='r', offset=HEADER_SIZE,
+                         shape=(self.shoes, self.shoe_size))
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+# ==========================================
+# 2. Replaying Trials
+# ==========================================
+# Average cards a round takes, with some margin; sizes each trial's share of the tape
+CARDS_PER_ROUND = {'baccarat': 5.2, 'blackjack': 5.8}
+
+class TapeShare:
+    """The shoes of a tape that belong to one trial, so a trial can never deal another trial's cards."""
+    def __init__(self, tape, first_shoe, shoes):
+        self.tape = tape
+        self.first_shoe = first_shoe
+        self.shoes = shoes
+        self.num_decks = tape.num_decks
+        self.penetration = tape.penetration
+
+    def shoe(self, index):
+        if index >= self.shoes:
+            raise IndexError(f"A trial needed more than its {self.shoes} shoes of {self.tape.path}; "
+                             f"use a longer tape, fewer trials or more shoes_per_trial")
+        return self.tape.shoe(self.first_shoe + index)
+
+def shoes_needed(config, tape):
+    """Shoes a trial of config is expected to deal from this tape, rounded up with one to spare."""
+    cards_per_shoe = int(tape.shoe_size * tape.penetration)
+    return math.ceil(config.rounds * CARDS_PER_ROUND[config.game] / cards_per_shoe) + 1
+
+def _run_chunk(tape, config, shoes_per_trial, trials):
+    results = {}
+    for t in trials:
+        shoe = ReplayShoe(TapeShare(tape, t * shoes_per_trial, shoes_per_trial))
+        try:
+            game = make_game(config.game, config.strategy_cls, config.params, shoe)
+            played, reason = run_rounds(game, config.rounds, config.stop or StopConditions())
+            results[t] = game.strategy.profit, game.strategy.bankroll, played, reason
+        finally:
+            # Counting strategies hook into shoe.on_shuffle, a cycle that would keep
+            # this view into the map alive until the next GC and block tape.close()
+            shoe.ranks = None
+    return results
+
+def replay(config, tape_path, trials, shoes_per_trial=None, workers=None):
+    """
+    Runs `trials` trials of config dealt from the tape instead of shuffled shoes
+    and returns summarize() of them. Trial t gets shoes t * shoes_per_trial
+    onwards and can deal no others, so trials never share cards. Raises
+    ValueError up front if the shares look too small for config.rounds, and
+    IndexError if a trial still runs past its share. The tape's decks and
+    penetration override the config's.
+    """
+    tape = ShoeTape(tape_path)
+    try:
+        shoes_per_trial = shoes_per_trial or len(tape) // trials
+        needed = shoes_needed(config, tape)
+        if shoes_per_trial < needed:
+            raise ValueError(f"{tape_path} holds {len(tape)} shoes, {shoes_per_trial} per trial, but "
+                             f"{config.rounds} rounds need about {needed}: write at least "
+                             f"{needed * trials} shoes or run fewer trials")
+
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, trials // (workers * 4))
+        chunks = [list(range(start, min(start + chunk_size, trials))) for start in range(0, trials, chunk_size)]
+        done = {}
+        if workers == 1:
+            for chunk in chunks:
+                done.update(_run_chunk(tape, config, shoes_per_trial, chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for f in [pool.submit(_run_chunk, tape, config, shoes_per_trial, chunk) for chunk in chunks]:
+                    done.update(f.result())
+    finally:
+        gc.collect() # Anything else still holding a view
+        tape.close()
+    return summarize([done[t] for t in range(trials)])
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'shoes_8d.tape'
+    SHOES = 20000
+    TRIALS = 1000
+
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        write_tape(path, num_decks=8, penetration=0.75, shoes=SHOES, seed=42)
+        print(f"Wrote {SHOES} shoes to {path} in {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    config = TrialConfig('baccarat', Martingale, {'bankroll': 5000, 'base_unit': 10}, rounds=1000)
+    start = time.perf_counter()
+    summary = replay(config, path, TRIALS)
+    print_summary(f"baccarat (Martingale) from {path}", summary)
+    print(f"{TRIALS} trials in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,125 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine import BASE
+from store import DEFAULT_PATH, RateStore
+
+# --- INDEX ---
+class AsOfIndex:
+    """
+    Historical fixings arranged for as-of lookups: per currency a sorted
+    array of fixing days and the CZK per unit of each. A timestamp resolves
+    to the latest fixing on or before it in O(log n), so weekends and
+    holidays take the last business day's rate. With max_age (days), older
+    fixings count as missing instead.
+    """
+    def __init__(self, days, codes, rates, max_age=None):
+        days = np.asarray(days, dtype='datetime64[D]')
+        rates = np.asarray(rates, dtype=np.float64)
+        labels, uniques = pd.factorize(np.asarray(codes, dtype=object))
+        order = np.lexsort((days, labels)) # Integer labels sort far faster than the code strings
+        days, labels, rates = days[order], labels[order], rates[order]
+        bounds = np.searchsorted(labels, np.arange(len(uniques) + 1))
+        self.days = {code: days[bounds[i]:bounds[i + 1]] for i, code in enumerate(uniques)}
+        self.rates = {code: rates[bounds[i]:bounds[i + 1]] for i, code in enumerate(uniques)}
+        self.max_age = max_age
+
+    @classmethod
+    def from_store(cls, store, max_age=None):
+        return cls(*store.history(), max_age=max_age)
+
+    @classmethod
+    def from_series(cls, series, max_age=None):
+        """From a date x currency frame such as bulk.load_range() returns."""
+        long = series.stack().dropna()
+        return cls(long.index.get_level_values(0).values, long.index.get_level_values(1).values,
+                   long.values, max_age)
+
+    def rate(self, code, when):
+        """(fixing day, CZK per unit) valid at `when`, or None before the first fixing. Raises KeyError for an unknown code."""
+        code = code.strip().upper()
+        if code == BASE: return np.datetime64(when, 'D'), 1.0
+        days = self.days[code]
+        day = np.datetime64(when, 'D')
+        i = np.searchsorted(days, day, side='right') - 1
+        if i < 0 or (self.max_age is not None and day - days[i] > self.max_age):
+            return None
+        return days[i], float(self.rates[code][i])
+
+    def rates_at(self, codes, when):
+        """Vectorized rate(): CZK per unit of each (code, timestamp) pair, NaN where none is valid."""
+        codes = pd.Series(np.asarray(codes, dtype=object)).str.strip().str.upper().to_numpy()
+        when = np.asarray(when, dtype='datetime64[D]')
+        result = np.full(len(codes), np.nan)
+        labels, uniques = pd.factorize(codes)
+        for label, code in enumerate(uniques):
+            rows = np.flatnonzero(labels == label)
+            if code == BASE:
+                result[rows] = 1.0
+                continue
+            if code not in self.days: continue
+            days = self.days[code]
+            i = np.searchsorted(days, when[rows], side='right') - 1
+            ok = i >= 0
+            if self.max_age is not None:
+                ok &= (when[rows] - days[np.maximum(i, 0)]) <= np.timedelta64(self.max_age, 'D')
+            result[rows[ok]] = self.rates[code][i[ok]]
+        return result
+
+    def convert_many(self, amounts, from_codes, to_codes, when):
+        """Each amount converted at the fixing valid on its own date; NaN where a rate is missing."""
+        return np.asarray(amounts, dtype=np.float64) * self.rates_at(from_codes, when) / self.rates_at(to_codes, when)
+
+    # --- DATAFRAME PATH ---
+    def long_frame(self):
+        """(datum, kód, kurz) rows of the whole index, sorted by date as merge_asof needs."""
+        frames = [pd.DataFrame({'datum': days.astype('datetime64[ns]'), 'kód': code, 'kurz': self.rates[code]})
+                  for code, days in self.days.items()]
+        if not frames: return pd.DataFrame({'datum': pd.Series(dtype='datetime64[ns]'), 'kód': [], 'kurz': []})
+        return pd.concat(frames, ignore_index=True).sort_values('datum', kind='stable')
+
+    def convert_frame(self, df, date_col='date', amount_col='amount', from_col='from', to_col='to',
+                      result_column='result'):
+        """
+        Copy of df with result_column added, each row converted at the fixing
+        valid on its date. Uses pd.merge_asof by currency, one pass per side.
+        """
+        history = self.long_frame()
+        tolerance = pd.Timedelta(days=self.max_age) if self.max_age is not None else None
+        left = pd.DataFrame({
+            'row': np.arange(len(df)),
+            'datum': pd.to_datetime(df[date_col]).dt.normalize().astype('datetime64[ns]').to_numpy(),
+            'from': df[from_col].astype(str).str.strip().str.upper().to_numpy(),
+            'to': df[to_col].astype(str).str.strip().str.upper().to_numpy(),
+        }).sort_values('datum', kind='stable')
+
+        per_unit = {}
+        for side in ('from', 'to'):
+            merged = pd.merge_asof(left, history, on='datum', left_by=side, right_by='kód',
+                                   direction='backward', tolerance=tolerance)
+            rate = merged['kurz'].to_numpy(copy=True)
+            rate[merged[side].to_numpy() == BASE] = 1.0
+            per_unit[side] = np.empty(len(df))
+            per_unit[side][merged['row'].to_numpy()] = rate
+
+        out = df.copy()
+        out[result_column] = df[amount_col].to_numpy(dtype=np.float64) * per_unit['from'] / per_unit['to']
+        return out
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Převod transakcí s datem podle kurzu platného v daný den.")
+    parser.add_argument('input', help="CSV se sloupci date, amount, from, to")
+    parser.add_argument('output')
+    parser.add_argument('--db', default=DEFAULT_PATH)
+    parser.add_argument('--max-age', type=int, help="nejstarší použitelný kurz ve dnech")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = AsOfIndex.from_store(RateStore(args.db), args.max_age)
+    print(f"Index {len(index.days)} měn za {time.perf_counter() - start:.2f}s")
+    out = index.convert_frame(pd.read_csv(args.input))
+    out.to_csv(args.output, index=False)
+    print(f"Převedeno {len(out)} řádků, {int(out['result'].isna().sum())} bez platného kurzu.")
@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import datetime as dt
+import random
+import time
+
+import httpx
+import pandas as pd
+
+from store import format_date, parse_date
+
+BASE_URL = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/"
+YEAR_PATH = "rok.txt"           # ?rok=RRRR, every fixing of one year
+DAY_PATH = "denni_kurz.txt"     # ?date=DD.MM.RRRR, one fixing
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# --- PARSING ---
+def parse_year(text):
+    """
+    {date: {code: CZK per 1 unit}} from a rok.txt file. The file repeats its
+    'Datum|1 AUD|100 JPY|...' header whenever the list of currencies changes,
+    so each row is read against the header above it.
+    """
+    fixings = {}
+    header = None
+    for line in text.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) < 2: continue
+        if fields[0] == "Datum":
+            header = []
+            for column in fields[1:]:
+                amount, code = column.split()
+                header.append((code, int(amount)))
+            continue
+        if header is None: continue
+        rates = {}
+        for (code, amount), value in zip(header, fields[1:]):
+            if value.strip():
+                rates[code] = float(value.replace(",", ".")) / amount
+        fixings[parse_date(fields[0])] = rates
+    return fixings
+
+def parse_day(text):
+    """{date: {code: CZK per 1 unit}} from a denni_kurz.txt file."""
+    lines = text.splitlines()
+    rates = {}
+    for line in lines[2:]: # Info line and column header
+        fields = line.strip().split("|")
+        if len(fields) != 5: continue
+        _, _, amount, code, rate = fields
+        rates[code.strip()] = float(rate.replace(",", ".")) / int(amount)
+    return {parse_date(lines[0].split()[0]): rates}
+
+def to_series(fixings):
+    """One date x currency frame of CZK per unit, sorted by date; NaN where a currency was not fixed."""
+    df = pd.DataFrame.from_dict(fixings, orient='index')
+    df.index = pd.to_datetime(df.index)
+    df.index.name = 'datum'
+    return df.sort_index()[sorted(df.columns)]
+
+# --- DOWNLOADING ---
+async def fetch(client, limit, path, params, retries=4, backoff=0.5):
+    """
+    GET through the shared client, at most `limit` requests in flight.
+    Connection errors and 429/5xx answers are retried with exponential
+    backoff and jitter; other error statuses are raised at once.
+    """
+    for attempt in range(retries + 1):
+        async with limit:
+            try:
+                r = await client.get(path, params=params)
+                if r.status_code not in RETRY_STATUS:
+                    r.raise_for_status()
+                    return r.text
+                error = httpx.HTTPStatusError(f"{r.status_code} for {r.url}", request=r.request, response=r)
+            except httpx.TransportError as e:
+                error = e
+        if attempt == retries:
+            raise error
+        await asyncio.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+
+async def fetch_all(requests, base_url=BASE_URL, concurrency=8, retries=4, backoff=0.5, timeout=30.0):
+    """Texts of [(path, params), ...] in the same order, over one pooled connection set."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        return await asyncio.gather(*(fetch(client, limit, path, params, retries, backoff)
+                                      for path, params in requests))
+
+def load_years(years, **options):
+    """Date x currency frame from the yearly files of `years`. Options go to fetch_all."""
+    texts = asyncio.run(fetch_all([(YEAR_PATH, {'rok': year}) for year in years], **options))
+    fixings = {}
+    for text in texts:
+        fixings.update(parse_year(text))
+    return to_series(fixings)
+
+def load_days(days, **options):
+    """Date x currency frame from the daily files of `days`; a holiday resolves to the fixing before it."""
+    texts = asyncio.run(fetch_all([(DAY_PATH, {'date': format_date(day)}) for day in days], **options))
+    fixings = {}
+    for text in texts:
+        fixings.update(parse_day(text))
+    return to_series(fixings)
+
+def load_range(start, end, daily=False, **options):
+    """
+    Fixings between start and end (inclusive). By default from the yearly
+    files, one request per year; daily=True fetches every weekday instead.
+    """
+    if daily:
+        days = [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+        return load_days([day for day in days if day.weekday() < 5], **options)
+    series = load_years(range(start.year, end.year + 1), **options)
+    return series.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hromadné stažení historických kurzů ČNB.")
+    parser.add_argument('start', help="od (DD.MM.RRRR)")
+    parser.add_argument('end', help="do (DD.MM.RRRR)")
+    parser.add_argument('--daily', action='store_true', help="stahovat po dnech místo ročních souborů")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--output', default='kurzy.csv')
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    series = load_range(parse_date(args.start), parse_date(args.end), args.daily,
+                        base_url=args.base_url, concurrency=args.concurrency)
+    series.to_csv(args.output)
+    print(f"{len(series)} dní x {len(series.columns)} měn -> {args.output} "
+          f"({time.perf_counter() - start_time:.1f}s)")
@@ -0,0 +1,126 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE = 'CZK'
+
+# --- CROSS RATES ---
+class CrossRates:
+    """
+    Dense cross-rate matrix of one fixing, CZK included: matrix[i, j] is how
+    many units of codes[j] one unit of codes[i] buys. Built once per loaded
+    fixing, so a conversion is a single multiplication and a batch is one
+    fancy-indexed gather.
+    """
+    def __init__(self, codes, czk_per_unit):
+        self.codes = pd.Index([BASE] + [c.upper() for c in codes])
+        per_unit = np.concatenate([[1.0], np.asarray(czk_per_unit, dtype=np.float64)])
+        self.matrix = per_unit[:, None] / per_unit[None, :]
+
+    @classmethod
+    def from_frame(cls, df):
+        """From a load_data() frame indexed by 'kód'."""
+        return cls(list(df.index), (df['kurz'] / df['množství']).to_numpy())
+
+    def position(self, code):
+        """Row of a currency code. Raises KeyError for an unknown code."""
+        return self.codes.get_loc(code.strip().upper())
+
+    def convert(self, amount, from_code, to_code):
+        return amount * self.matrix[self.position(from_code), self.position(to_code)]
+
+    def positions(self, codes):
+        """Rows of an array of codes, -1 where unknown. Each distinct code is looked up once."""
+        labels, uniques = pd.factorize(np.asarray(codes, dtype=object))
+        found = self.codes.get_indexer(pd.Index(uniques).str.strip().str.upper())
+        return np.append(found, -1)[labels] # factorize marks missing values with -1 too
+
+    def convert_many(self, amounts, from_codes, to_codes):
+        """Vectorized convert(); NaN where a code is unknown."""
+        src = self.positions(from_codes)
+        dst = self.positions(to_codes)
+        result = np.asarray(amounts, dtype=np.float64) * self.matrix[src, dst]
+        result[(src < 0) | (dst < 0)] = np.nan
+        return result
+
+# --- BATCH FILES ---
+def read_chunks(path, chunk_rows):
+    """DataFrames of at most chunk_rows rows from a CSV or Parquet file."""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Pro Parquet je potřeba balíček pyarrow (pip install pyarrow).")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+class ChunkWriter:
+    """Appends DataFrames to a CSV or Parquet file one chunk at a time."""
+    def __init__(self, path):
+        self.path = path
+        self.parquet = None
+        self.first = True
+
+    def write(self, df):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.path, table.schema)
+            self.parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self.first else 'a', header=self.first, index=False)
+        self.first = False
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+
+def convert_file(src, dst, rates, columns=('amount', 'from', 'to'), result_column='result', chunk_rows=1_000_000):
+    """
+    Converts every (amount, from, to) row of src into dst with a result column
+    added, streaming chunk_rows rows at a time so memory stays flat however
+    large the file is. Returns (rows, rows with an unknown code).
+    """
+    amount_col, from_col, to_col = columns
+    writer = ChunkWriter(dst)
+    rows = unknown = 0
+    try:
+        for chunk in read_chunks(src, chunk_rows):
+            result = rates.convert_many(chunk[amount_col].to_numpy(), chunk[from_col].to_numpy(),
+                                        chunk[to_col].to_numpy())
+            chunk[result_column] = result
+            writer.write(chunk)
+            rows += len(chunk)
+            unknown += int(np.isnan(result).sum())
+    finally:
+        writer.close()
+    return rows, unknown
+
+if __name__ == "__main__":
+    from exchange import load_data
+
+    parser = argparse.ArgumentParser(description="Hromadný převod měn z CSV/Parquet souboru (sloupce amount, from, to).")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--date', help="kurzy ke dni (DD.MM.RRRR), jinak dnešní")
+    parser.add_argument('--offline', action='store_true')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    info, df = load_data(args.date, offline=args.offline)
+    if df is None:
+        raise SystemExit(1)
+    rates = CrossRates.from_frame(df)
+    start = time.perf_counter()
+    rows, unknown = convert_file(args.input, args.output, rates, chunk_rows=args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    print(f"Kurzy {info}: převedeno {rows} řádků za {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} řádků/s)")
+    if unknown:
+        print(f"{unknown} řádků s neznámou měnou ({os.path.basename(args.output)} má ve sloupci result NaN).")
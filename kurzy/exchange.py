@@ -1,44 +1,215 @@
-import httpx
-import pandas as pd
-import io
-from prettytable import PrettyTable
+import argparse
+import datetime as dt
+import itertools
+import queue
 import shutil
 import sys
+import threading
+
+# pandas, numpy, httpx and prettytable are imported where they are needed:
+# together they take far longer to load than a one-shot conversion takes to run
+from store import DEFAULT_PATH, RateStore, format_date, parse_date, today
 
 # --- HELPER FUNCTIONS ---
 def print_header(text, char="-"):
     columns = shutil.get_terminal_size().columns
     print((' ' + text + ' ').center(columns, char))
 
-def load_data(date=None):
-    """Fetches data from CNB. Returns (info_string, dataframe) or None on error."""
-    url = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/denni_kurz.txt"
-    params = {}
-    if date:
-        params = {'date': date}
-    
+URL = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/denni_kurz.txt"
+COLUMNS = ['země', 'měna', 'množství', 'kód', 'kurz']
+
+# --- LOCAL STORE ---
+STORE_PATH = DEFAULT_PATH
+_store = None
+
+def get_store():
+    """Opens the local rate store on first use."""
+    global _store
+    if _store is None:
+        _store = RateStore(STORE_PATH)
+    return _store
+
+# --- DOWNLOADING ---
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """One pooled HTTP client for the whole app, so repeated loads reuse the connection to CNB."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+            _client = httpx.Client(timeout=10.0, limits=httpx.Limits(max_connections=4))
+        return _client
+
+def fetch(requested):
+    """
+    Downloads the fixing for the `requested` date into the store and returns
+    (info_string, rows). Sends the ETag/Last-Modified of the previous
+    download, so an unchanged file costs a 304 and no parsing.
+    """
+    store = get_store()
+    headers = {}
+    etag, modified = store.validators(requested)
+    if etag: headers['If-None-Match'] = etag
+    if modified: headers['If-Modified-Since'] = modified
+    params = {} if requested >= today() else {'date': format_date(requested)}
+
+    r = get_client().get(URL, params=params, headers=headers)
+    if r.status_code == 304:
+        cached = store.lookup(requested, fresh_only=False)
+        if cached:
+            store.touch(requested)
+            return cached
+        r = get_client().get(URL, params=params) # Validators without a stored answer, ask again in full
+    r.raise_for_status() # Check for 404/500 errors
+    info, rows = parse_text(r.text)
+    store.put(requested, info, rows, etag=r.headers.get('ETag'), modified=r.headers.get('Last-Modified'))
+    return info, rows
+
+def parse_text(text):
+    """Returns (info_string, rows) where rows are (země, měna, množství, kód, kurz) tuples."""
+    lines = text.splitlines()
+    info = lines[0].strip() # Extract date info
+    rows = []
+    for line in lines[2:]: # Skip the column header
+        fields = line.split("|")
+        if len(fields) != 5: continue
+        country, currency, amount, code, rate = fields
+        rows.append((country, currency, int(amount), code.strip(), float(rate.replace(",", "."))))
+    return info, rows
+
+def to_frame(rows):
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    # OPTIMIZATION: Set 'kód' as index for instant lookups
+    df.set_index('kód', inplace=True)
+    return df
+
+def per_unit(rows):
+    """{kód: CZK per 1 unit}, CZK included - all a single conversion needs."""
+    rates = {'CZK': 1.0}
+    for _, _, amount, code, rate in rows:
+        rates[code] = rate / amount
+    return rates
+
+def load_rates(date=None, offline=False):
+    """
+    Returns (info_string, rows) or (None, None) on error. Past dates come
+    from the local store once fetched; today's rates are fetched again after
+    CNB publishes a new fixing. Offline, the newest stored fixing is used.
+    """
     try:
-        r = httpx.get(url, params=params)
-        r.raise_for_status() # Check for 404/500 errors
-        
-        data = r.text.splitlines()
-        info = data.pop(0) # Extract date info
-        csv_data = "\n".join(data)
-        
-        # Parse CSV
-        df = pd.read_csv(io.StringIO(csv_data), sep="|", decimal=",", header="infer")
-        
-        # OPTIMIZATION: Set 'kód' as index for instant lookups
-        df['kód'] = df['kód'].str.strip() # clean whitespace just in case
-        df.set_index('kód', inplace=True) 
-        
-        return info, df
-        
+        requested = parse_date(date) if date else today()
+    except ValueError:
+        print(f"Chyba: Neplatné datum {date}.")
+        return None, None
+
+    store = get_store()
+    cached = store.lookup(requested, fresh_only=not offline)
+    if cached is None and offline:
+        cached = store.latest(requested)
+        if cached is None:
+            print("Offline režim: pro toto datum nejsou uložená žádná data.")
+            return None, None
+    if cached:
+        return cached
+
+    try:
+        return fetch(requested)
+
     except Exception as e:
         print(f"Chyba při stahování dat: {e}")
+        fallback = store.latest(requested)
+        if fallback:
+            print("Používám poslední uložená data.")
+            return fallback
         return None, None
 
+def load_data(date=None, offline=False):
+    """Like load_rates, as (info_string, dataframe indexed by 'kód')."""
+    info, rows = load_rates(date, offline)
+    if rows is None: return None, None
+    return info, to_frame(rows)
+
+def sync(start, end):
+    """Fetches only the dates between start and end that are not in the store yet."""
+    store = get_store()
+    missing = store.missing(start, end)
+    for i, day in enumerate(missing, 1):
+        info, _ = fetch(day)
+        print(f"\r{i}/{len(missing)} {info}", end="")
+    print(f"\nStaženo {len(missing)} chybějících dní.")
+
+# --- BACKGROUND LOADING ---
+WANTED, NEIGHBOUR = 0, 1 # Dates someone is waiting for go before prefetched ones
+
+class Prefetcher:
+    """
+    Loads fixings into the store on a worker thread, so the menu never waits
+    on the network: request() a date and carry on, take() the result once
+    it is there. Prefetched neighbours only land in the store.
+    """
+    def __init__(self):
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()
+        self.changed = threading.Condition()
+        self.pending = set()
+        self.wanted = set()
+        self.results = {}
+        threading.Thread(target=self._work, daemon=True).start()
+
+    def request(self, requested, priority=WANTED):
+        with self.changed:
+            if priority == WANTED: self.wanted.add(requested)
+            if requested in self.pending: return
+            self.pending.add(requested)
+        self.queue.put((priority, next(self.order), requested))
+
+    def focus(self, requested):
+        """Keeps only the result for `requested`; dates viewed before it are no longer wanted."""
+        with self.changed:
+            self.wanted &= {requested}
+            self.results = {day: outcome for day, outcome in self.results.items() if day == requested}
+
+    def take(self, requested):
+        """(info_string, rows), or the exception the download raised, once done; None before."""
+        with self.changed:
+            return self.results.pop(requested, None)
+
+    def wait(self, requested):
+        with self.changed:
+            self.changed.wait_for(lambda: requested in self.results)
+            return self.results.pop(requested)
+
+    def prefetch_around(self, day):
+        """Queues the weekdays just before and after `day`, unless they are in the future."""
+        for step in (-1, 1):
+            neighbour = day + dt.timedelta(days=step)
+            while neighbour.weekday() >= 5:
+                neighbour += dt.timedelta(days=step)
+            if neighbour <= today():
+                self.request(neighbour, NEIGHBOUR)
+
+    def _work(self):
+        store = get_store()
+        while True:
+            _, _, requested = self.queue.get()
+            try:
+                outcome = store.lookup(requested) or fetch(requested)
+            except Exception as e:
+                outcome = e
+            with self.changed:
+                self.pending.discard(requested)
+                if requested in self.wanted:
+                    self.wanted.discard(requested)
+                    self.results[requested] = outcome
+                self.changed.notify_all()
+
 def print_table(df, codes=None):
+    from prettytable import PrettyTable
+
     x = PrettyTable()
     x.field_names = ['Kód', 'Země', 'Měna', 'Množství', 'Kurz']
     
@@ -59,46 +230,69 @@ def print_table(df, codes=None):
     print(x)
 
 # --- CONVERSION LOGIC ---
-def get_rate(df, code):
-    """Safely gets rate components. Returns (quantity, rate) or None."""
+def convert(amount, from_code, to_code, rates):
+    """Converts through the fixing's CrossRates, CZK included. Returns None for an unknown code."""
     try:
-        row = df.loc[code.upper()]
-        return row['množství'], row['kurz']
+        return rates.convert(amount, from_code, to_code)
     except KeyError:
-        print(f"Měna {code} nenalezena.")
+        unknown = from_code if from_code.strip().upper() not in rates.codes else to_code
+        print(f"Měna {unknown} nenalezena.")
         return None
 
-def convert(amount, from_code, to_code, df):
-    # 1. Get Source Data
-    source = get_rate(df, from_code)
-    if not source: return None
-    src_qty, src_rate = source
-
-    # 2. Get Target Data
-    target = get_rate(df, to_code)
-    if not target: return None
-    target_qty, target_rate = target
+# --- MAIN APP ---
+def quick_convert(amount, from_code, to_code, date=None, offline=False):
+    """Non-interactive conversion without pandas: prints the result, returns the exit code."""
+    info, rows = load_rates(date, offline)
+    if rows is None: return 1
+    rates = per_unit(rows)
+    for code in (from_code, to_code):
+        if code.upper() not in rates:
+            print(f"Měna {code} nenalezena.")
+            return 1
+    res = amount * rates[from_code.upper()] / rates[to_code.upper()]
+    print(f"{amount:g} {from_code.upper()} = {res:.2f} {to_code.upper()} (kurzy {info})")
+    return 0
 
-    # 3. Math: (Amount * Rate / Qty) = CZK Value
-    val_in_czk = amount * (src_rate / src_qty)
-    
-    # 4. Math: (CZK / Rate * Qty) = Target Value
-    final_val = val_in_czk / target_rate * target_qty
-    
-    return final_val
+def main(offline=False):
+    from engine import CrossRates
 
-# --- MAIN APP ---
-def main():
     print_header("Načítání dat...")
-    info, df = load_data()
-    
-    if df is None:
+    store = get_store()
+    loader = None if offline else Prefetcher()
+    shown = viewed = today()
+
+    # Start from the last known data and refresh today's fixing in the background
+    fixing = store.lookup(viewed, fresh_only=False) or store.latest(viewed)
+    if loader and store.lookup(viewed) is None:
+        loader.request(viewed)
+        if fixing is None: # Nothing stored yet, the very first run has to wait
+            fixing = loader.wait(viewed)
+            if isinstance(fixing, Exception):
+                print(f"Chyba při stahování dat: {fixing}")
+                fixing = None
+    if fixing is None:
+        if offline: print("Offline režim: nejsou uložená žádná data.")
         return # Exit if internet is down
+    info, df = fixing[0], to_frame(fixing[1])
+    rates = CrossRates.from_frame(df) # Built once per loaded fixing
 
     # Main application loop
     while True:
+        # Pick up whatever the background loader finished for the date being viewed
+        outcome = loader.take(viewed) if loader else None
+        if isinstance(outcome, Exception):
+            print(f"Chyba při stahování dat: {outcome}")
+            if viewed != shown: print("Návrat k předchozím datům.")
+            viewed = shown
+        elif outcome:
+            info, df = outcome[0], to_frame(outcome[1])
+            rates = CrossRates.from_frame(df)
+            shown = viewed
+
         print_header('Převodník měn CNB', "=")
         print(f'Kurzy platné pro: {info}')
+        if viewed != shown:
+            print(f'Kurzy pro {format_date(viewed)} se stahují na pozadí...')
         
         print('''
     1. Rychlý přehled (EUR, USD)
@@ -121,17 +315,7 @@ def main():
                 curr_from = input("Z měny (kód, např. CZK, EUR): ").upper()
                 curr_to = input("Na měnu (kód, např. USD): ").upper()
 
-                # Handle CZK logic manually since it's not in the table
-                if curr_from == 'CZK' and curr_to == 'CZK':
-                    res = amt
-                elif curr_from == 'CZK':
-                    tgt = get_rate(df, curr_to)
-                    if tgt: res = amt / tgt[1] * tgt[0]
-                elif curr_to == 'CZK':
-                    src = get_rate(df, curr_from)
-                    if src: res = amt * src[1] / src[0]
-                else:
-                    res = convert(amt, curr_from, curr_to, df)
+                res = convert(amt, curr_from, curr_to, rates)
 
                 if res is not None:
                     print_header(f"{amt} {curr_from} = {res:.2f} {curr_to}")
@@ -147,17 +331,58 @@ def main():
 
         elif choice == '4':
             date_input = input("Zadejte datum (DD.MM.RRRR): ")
-            new_info, new_df = load_data(date_input)
-            if new_df is not None:
-                info = new_info
-                df = new_df
+            try:
+                requested = parse_date(date_input)
+            except ValueError:
+                print(f"Chyba: Neplatné datum {date_input}.")
+                continue
+            if loader:
+                loader.focus(requested)
+
+            fixing = store.lookup(requested, fresh_only=False)
+            if fixing is None and offline:
+                fixing = store.latest(requested)
+            if fixing is not None:
+                info, df = fixing[0], to_frame(fixing[1])
+                rates = CrossRates.from_frame(df)
+                shown = viewed = requested
                 print("Historická data načtena.")
+                if loader and store.lookup(requested) is None:
+                    loader.request(requested) # Today's fixing from before the latest publication
+            elif loader:
+                viewed = requested
+                loader.request(requested)
+                print("Data se stahují na pozadí, menu můžete dál používat.")
             else:
+                print("Offline režim: pro toto datum nejsou uložená žádná data.")
                 print("Návrat k aktuálním datům.")
+            if loader:
+                loader.prefetch_around(requested)
 
         elif choice == '5':
             print("Nashledanou!")
             break
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Převodník měn podle kurzů ČNB.")
+    parser.add_argument('--offline', action='store_true', help="nestahovat, použít jen uložená data")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="soubor s uloženými kurzy")
+    parser.add_argument('--sync', nargs=2, metavar=('OD', 'DO'), help="stáhnout chybějící dny (DD.MM.RRRR)")
+    commands = parser.add_subparsers(dest='command')
+    one_shot = commands.add_parser('convert', help="jednorázový převod, např. convert 100 EUR USD")
+    one_shot.add_argument('amount', type=lambda text: float(text.replace(",", ".")))
+    one_shot.add_argument('from_code')
+    one_shot.add_argument('to_code')
+    one_shot.add_argument('--date', help="kurzy ke dni (DD.MM.RRRR)")
+    # SUPPRESS keeps 'exchange.py --offline convert ...' working too
+    one_shot.add_argument('--offline', action='store_true', default=argparse.SUPPRESS,
+                          help="nestahovat, použít jen uložená data")
+    args = parser.parse_args()
+
+    STORE_PATH = args.db
+    if args.sync:
+        sync(parse_date(args.sync[0]), parse_date(args.sync[1]))
+    elif args.command == 'convert':
+        sys.exit(quick_convert(args.amount, args.from_code, args.to_code, args.date, args.offline))
+    else:
+        main(offline=args.offline)
\ No newline at end of file
@@ -0,0 +1,184 @@
+import datetime as dt
+import os
+import sqlite3
+import threading
+import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kurzy.sqlite')
+try:
+    PRAGUE = ZoneInfo('Europe/Prague')
+except ZoneInfoNotFoundError: # Windows without the tzdata package: use the local clock
+    PRAGUE = None
+PUBLISHED_AT = dt.time(14, 30) # CNB publishes the day's fixing on business days after 14:30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixings (
+    day TEXT PRIMARY KEY,           -- ISO date the fixing is valid for
+    info TEXT NOT NULL              -- first line of denni_kurz.txt, e.g. '17.10.2025 #201'
+);
+CREATE TABLE IF NOT EXISTS rates (
+    day TEXT NOT NULL,
+    code TEXT NOT NULL,
+    country TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    rate REAL NOT NULL,
+    PRIMARY KEY (day, code)
+);
+CREATE TABLE IF NOT EXISTS lookups (
+    requested TEXT PRIMARY KEY,     -- date that was asked for (weekends resolve to an earlier fixing)
+    day TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS validators (
+    requested TEXT PRIMARY KEY,     -- HTTP validators of the last download, for conditional requests
+    etag TEXT,
+    modified TEXT
+);
+"""
+
+# --- DATES ---
+def today():
+    return dt.datetime.now(PRAGUE).date()
+
+def parse_date(text):
+    """'DD.MM.RRRR' -> date. Raises ValueError on anything else."""
+    return dt.datetime.strptime(text.strip(), "%d.%m.%Y").date()
+
+def format_date(day):
+    return day.strftime("%d.%m.%Y")
+
+def last_publication(now=None):
+    """Moment of the newest fixing that can exist at `now` (Prague time)."""
+    now = now or dt.datetime.now(PRAGUE)
+    published = dt.datetime.combine(now.date(), PUBLISHED_AT, PRAGUE)
+    return published if now >= published else published - dt.timedelta(days=1)
+
+def publication(day):
+    """Moment the fixing for `day` is published, or would be on a business day (Prague time)."""
+    return dt.datetime.combine(day, PUBLISHED_AT, PRAGUE)
+
+def info_date(info):
+    """Fixing date from the info line '17.10.2025 #201'."""
+    return parse_date(info.split()[0])
+
+# --- STORE ---
+class RateStore:
+    """
+    Parsed daily fixings in SQLite, keyed by date. A fixing is immutable once
+    published, so past dates are served from here forever; today's lookup
+    goes stale at the next CNB publication time, and so does any answer
+    fetched before its own date's fixing was out. Safe to share between
+    the menu and a background loader thread.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.lock = threading.RLock()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def fixing(self, day):
+        """(info, [(country, currency, amount, code, rate), ...]) of the fixing valid for `day`, or None."""
+        with self.lock:
+            row = self.db.execute("SELECT info FROM fixings WHERE day = ?", (day.isoformat(),)).fetchone()
+            if row is None: return None
+            rates = self.db.execute(
+                "SELECT country, currency, amount, code, rate FROM rates WHERE day = ? ORDER BY rowid",
+                (day.isoformat(),)).fetchall()
+            return row[0], rates
+
+    def lookup(self, requested, fresh_only=True):
+        """Stored answer for a request of `requested` date, or None if unknown or stale."""
+        with self.lock:
+            row = self.db.execute("SELECT day, fetched_at FROM lookups WHERE requested = ?",
+                                  (requested.isoformat(),)).fetchone()
+            if row is None: return None
+            day, fetched_at = row
+            day = dt.date.fromisoformat(day)
+            if fresh_only and self._stale(requested, day, fetched_at):
+                return None
+            return self.fixing(day)
+
+    @staticmethod
+    def _stale(requested, day, fetched_at):
+        """
+        Whether a stored answer may be superseded: today's from before the
+        latest publication, or an earlier fixing fetched before `requested`
+        had its own published (CNB answers with the last one until 14:30).
+        """
+        if requested >= today() and fetched_at < last_publication().timestamp():
+            return True
+        return day < requested and fetched_at < publication(requested).timestamp()
+
+    def latest(self, on_or_before=None):
+        """Newest stored fixing not after the given date, for offline use."""
+        on_or_before = on_or_before or today()
+        with self.lock:
+            row = self.db.execute("SELECT day FROM fixings WHERE day <= ? ORDER BY day DESC LIMIT 1",
+                                  (on_or_before.isoformat(),)).fetchone()
+            return self.fixing(dt.date.fromisoformat(row[0])) if row else None
+
+    def put(self, requested, info, rates, fetched_at=None, etag=None, modified=None):
+        """Stores a fetched fixing, remembers which request it answered and the response's validators."""
+        day = info_date(info).isoformat()
+        with self.lock:
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO fixings (day, info) VALUES (?, ?)", (day, info))
+                self.db.execute("DELETE FROM rates WHERE day = ?", (day,))
+                self.db.executemany(
+                    "INSERT INTO rates (day, code, country, currency, amount, rate) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(day, code, country, currency, int(amount), float(rate))
+                     for country, currency, amount, code, rate in rates])
+                self.db.execute("INSERT OR REPLACE INTO lookups (requested, day, fetched_at) VALUES (?, ?, ?)",
+                                (requested.isoformat(), day, fetched_at or time.time()))
+                self.db.execute("INSERT OR REPLACE INTO validators (requested, etag, modified) VALUES (?, ?, ?)",
+                                (requested.isoformat(), etag, modified))
+
+    def validators(self, requested):
+        """(ETag, Last-Modified) of the last download for `requested`, or (None, None)."""
+        with self.lock:
+            row = self.db.execute("SELECT etag, modified FROM validators WHERE requested = ?",
+                                  (requested.isoformat(),)).fetchone()
+        return row or (None, None)
+
+    def touch(self, requested, fetched_at=None):
+        """Marks the stored answer for `requested` as checked now, after a 304 Not Modified."""
+        with self.lock:
+            with self.db:
+                self.db.execute("UPDATE lookups SET fetched_at = ? WHERE requested = ?",
+                                (fetched_at or time.time(), requested.isoformat()))
+
+    def history(self):
+        """
+        (days, codes, rates) lists of every stored rate, CZK per 1 unit, in no
+        particular order. Fetched as three concatenated columns instead of row
+        tuples, which is several times faster for decades of fixings.
+        """
+        with self.lock:
+            days, codes, rates = self.db.execute(
+                "SELECT group_concat(day), group_concat(code), group_concat(printf('%!.17g', rate / amount)) FROM rates").fetchone()
+            if days is None: return [], [], []
+            return days.split(","), codes.split(","), [float(r) for r in rates.split(",")]
+
+    def missing(self, start, end):
+        """Weekdays between start and end (inclusive) with neither a fixing nor a lookup that is still valid."""
+        with self.lock:
+            known = {r[0] for r in self.db.execute(
+                "SELECT day FROM fixings WHERE day BETWEEN ? AND ?", (start.isoformat(), end.isoformat()))}
+            for requested, day, fetched_at in self.db.execute(
+                    "SELECT requested, day, fetched_at FROM lookups WHERE requested BETWEEN ? AND ?",
+                    (start.isoformat(), end.isoformat())):
+                requested = dt.date.fromisoformat(requested)
+                if not self._stale(requested, dt.date.fromisoformat(day), fetched_at):
+                    known.add(requested.isoformat())
+        days = []
+        day = start
+        while day <= end:
+            if day.weekday() < 5 and day.isoformat() not in known:
+                days.append(day)
+            day += dt.timedelta(days=1)
+        return days
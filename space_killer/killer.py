@@ -1,13 +1,15 @@
+import errno
 import os
 import shutil
 import sys
 
 DEFAULT_PATH = ""
 
-def manage_disk_space(target_free_gb, path="C:\\Users\\Public\\Documents"):
+def manage_disk_space(target_free_gb, path="C:\\Users\\Public\\Documents", reserve=True):
     """
     Adjusts the size of 'space_filler.dat' to ensure exactly 'target_free_gb' 
     is available on the disk partition containing 'path'.
+    With reserve=True the space is claimed with fallocate instead of written.
     """
     dummy_filename = "space_filler.dat"
     file_path = os.path.join(path, dummy_filename)
@@ -29,7 +31,10 @@ def manage_disk_space(target_free_gb, path="C:\\Users\\Public\\Documents"):
         # Case A: Too much free space -> We need to FILL
         bytes_to_write = free - target_free_bytes
         print(f"Status: Filling disk. Need to consume {bytes_to_write / 1024**3:.2f} GB.")
-        _append_to_file(file_path, bytes_to_write)
+        if reserve:
+            _reserve_space(file_path, bytes_to_write)
+        else:
+            _append_to_file(file_path, bytes_to_write)
         
     elif free < target_free_bytes:
         # Case B: Too little free space -> We need to FREE up space
@@ -58,9 +63,44 @@ def manage_disk_space(target_free_gb, path="C:\\Users\\Public\\Documents"):
     _, _, final_free = shutil.disk_usage(path)
     print(f"Final free space: {final_free / 1024**3:.2f} GB")
 
+def _reserve_space(filepath, bytes_to_add):
+    """
+    Claims the space with a single posix_fallocate call, so even terabytes
+    take seconds. Checks st_blocks afterwards, because a sparse file would
+    free nothing. Falls back to writing zeros on Windows, on filesystems
+    without fallocate and when the blocks were not really allocated.
+    """
+    if not hasattr(os, 'posix_fallocate'): # Windows
+        return _append_to_file(filepath, bytes_to_add)
+
+    fd = os.open(filepath, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        before = os.fstat(fd)
+        try:
+            os.posix_fallocate(fd, before.st_size, bytes_to_add)
+            after = os.fstat(fd)
+            allocated = (after.st_blocks - before.st_blocks) * 512 # st_blocks counts 512-byte units
+            if allocated + after.st_blksize >= bytes_to_add:
+                print(f"Reserved {allocated / 1024**3:.2f} GB.")
+                return
+            print(f"Warning: only {allocated / 1024**3:.2f} GB really allocated (sparse file).")
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL):
+                os.ftruncate(fd, before.st_size)
+                print(f"IO Error: {e}")
+                return
+            print("Warning: fallocate is not supported here.")
+        os.ftruncate(fd, before.st_size)
+    finally:
+        os.close(fd)
+
+    print("Writing zeros instead.")
+    _append_to_file(filepath, bytes_to_add)
+
 def _append_to_file(filepath, bytes_to_add):
     """Helper function to append zeros to the file."""
     chunk_size = 10 * 1024 * 1024 # 10MB
+    zeros = memoryview(bytes(chunk_size)) # One buffer, sliced for the last chunk
     mode = 'ab' if os.path.exists(filepath) else 'wb'
     
     try:
@@ -69,7 +109,7 @@ def _append_to_file(filepath, bytes_to_add):
             while written < bytes_to_add:
                 remaining = bytes_to_add - written
                 current_chunk = min(chunk_size, remaining)
-                f.write(b'\0' * current_chunk)
+                f.write(zeros[:current_chunk])
                 written += current_chunk
                 
                 # Progress bar